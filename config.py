@@ -55,6 +55,16 @@ BTN_STOP_GPIO  = int(os.getenv("BTN_STOP_GPIO",  "6"))
 BTN_MENU_GPIO  = int(os.getenv("BTN_MENU_GPIO",  "13"))
 BTN_BACK_GPIO  = int(os.getenv("BTN_BACK_GPIO",  "19"))
 
+# ─────────────────────────────────────────────
+# OLED SSD1306 — I2C par défaut, SPI0 matériel en option
+# (SPI : MOSI=GPIO10, SCLK=GPIO11, CS=CE0/GPIO8, DC et RST ci-dessous)
+# ─────────────────────────────────────────────
+OLED_BUS      = os.getenv("OLED_BUS", "i2c").lower()   # "i2c" | "spi"
+OLED_DC_GPIO  = int(os.getenv("OLED_DC_GPIO",  "25"))
+OLED_RST_GPIO = int(os.getenv("OLED_RST_GPIO", "16"))
+OLED_CS_GPIO  = int(os.getenv("OLED_CS_GPIO",  "8"))
+OLED_SPI_HZ   = int(os.getenv("OLED_SPI_HZ",   "8000000"))
+
 # ─────────────────────────────────────────────
 # GPS (SIM7600)
 # ─────────────────────────────────────────────
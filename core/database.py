@@ -6,7 +6,8 @@ Tables :
   badge_cache : uid_hash, driver_id, driver_name, cached_at
 
 Stratégie :
-  - Chaque événement est inséré en queue
+  - Chaque événement est inséré en queue (télémétrie : tampon mémoire
+    vidé en une transaction par le sync thread, cf. flush_pending)
   - Le sync thread lit par batch et envoie
   - ACK → suppression
   - FAIL → retry_count++ + backoff exponentiel
@@ -14,13 +15,64 @@ Stratégie :
 from __future__ import annotations
 import sqlite3
 import json
+import threading
 import time
+from collections import deque
+from contextlib import contextmanager
 from typing import Iterable
 
+# ── Sérialisation payloads : orjson (C) si dispo, sinon json stdlib ──
+try:
+    import orjson  # type: ignore
+    _dumps = orjson.dumps   # → bytes, stocké en BLOB
+    _loads = orjson.loads   # accepte bytes (BLOB) et str (anciennes lignes)
+except ImportError:
+    _dumps = json.dumps
+    _loads = json.loads
+
+# ── Connexions ───────────────────────────────────────────────────────
+# Une connexion persistante par thread et par fichier (main loop + sync
+# thread) : pas d'open()/parse d'en-tête à chaque événement, et le cache
+# de requêtes préparées de sqlite3 reste chaud.
+
+_tls = threading.local()
+
+
+def _conn(db_path: str) -> sqlite3.Connection:
+    conns = getattr(_tls, "conns", None)
+    if conns is None:
+        conns = _tls.conns = {}
+    con = conns.get(db_path)
+    if con is None:
+        # isolation_level=None : autocommit, transactions explicites
+        con = sqlite3.connect(db_path, isolation_level=None,
+                              check_same_thread=False)
+        con.execute("PRAGMA journal_mode=WAL")
+        con.execute("PRAGMA synchronous=NORMAL")
+        con.execute("PRAGMA temp_store=MEMORY")
+        con.execute("PRAGMA busy_timeout=5000")         # 2 threads écrivains
+        con.execute("PRAGMA mmap_size=67108864")        # lectures sans read()
+        con.execute("PRAGMA wal_autocheckpoint=1000")   # WAL borné (~4 Mo)
+        conns[db_path] = con
+    return con
+
+
+@contextmanager
+def _transaction(db_path: str):
+    """BEGIN IMMEDIATE … COMMIT (ROLLBACK si exception)."""
+    con = _conn(db_path)
+    con.execute("BEGIN IMMEDIATE")
+    try:
+        yield con
+    except BaseException:
+        con.execute("ROLLBACK")
+        raise
+    con.execute("COMMIT")
+
 
 def init_db(db_path: str) -> None:
-    with sqlite3.connect(db_path) as con:
-        con.executescript("""
+    with _transaction(db_path) as con:
+        con.execute("""
         CREATE TABLE IF NOT EXISTS outbox (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             ts REAL NOT NULL,
@@ -28,20 +80,24 @@ def init_db(db_path: str) -> None:
             payload TEXT NOT NULL,
             retry_count INTEGER DEFAULT 0,
             next_retry_at REAL DEFAULT 0
-        );
-
+        )""")
+        # (endpoint, id) : purge_old ; (next_retry_at, id) : dequeue_batch
+        con.execute("CREATE INDEX IF NOT EXISTS idx_outbox_ep_id "
+                    "ON outbox(endpoint, id)")
+        con.execute("CREATE INDEX IF NOT EXISTS idx_outbox_next_retry "
+                    "ON outbox(next_retry_at, id)")
+        con.execute("""
         CREATE TABLE IF NOT EXISTS badge_cache (
             uid_hash TEXT PRIMARY KEY,
             driver_id TEXT,
             driver_name TEXT,
             cached_at REAL
-        );
-
+        )""")
+        con.execute("""
         CREATE TABLE IF NOT EXISTS telemetry_queue (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             payload TEXT NOT NULL
-        );
-        """)
+        )""")
 
         # Migrer les anciennes données si présentes
         cur = con.execute("SELECT COUNT(*) FROM telemetry_queue")
@@ -54,102 +110,229 @@ def init_db(db_path: str) -> None:
             con.execute("DELETE FROM telemetry_queue")
             print(f"[DB] {old_count} anciens messages migrés vers outbox")
 
-        con.commit()
+
+# ── Tampon mémoire ───────────────────────────────────────────────────
+# La télémétrie (haute fréquence) n'est pas écrite à chaque point : elle
+# s'accumule ici et part sur la carte SD en un seul executemany/fsync par
+# cycle de sync. Les autres événements (auth, alertes, trajets) restent
+# écrits immédiatement, après vidage du tampon pour garder l'ordre.
+# Au vidage, les {"points": [...]} successifs sont fusionnés : une ligne
+# (un blob) par paquet de TELEMETRY_BATCH points plutôt qu'une par point.
+
+_BUFFERED_ENDPOINTS = frozenset({"telemetry"})
+_pending: deque = deque(maxlen=10_000)   # (ts, endpoint, payload non sérialisé)
+_pending_lock = threading.Lock()
+TELEMETRY_BATCH = 25   # points max par ligne outbox
+
+_INSERT_OUTBOX = "INSERT INTO outbox(ts, endpoint, payload) VALUES (?, ?, ?)"
+
+
+def _chunks(ts: float, endpoint: str, points: list) -> list[tuple]:
+    return [(ts, endpoint, _dumps({"points": points[i:i + TELEMETRY_BATCH]}))
+            for i in range(0, len(points), TELEMETRY_BATCH)]
+
+
+def _packed(entries) -> list[tuple]:
+    """Lignes outbox du tampon, points consécutifs regroupés par paquets."""
+    rows, run = [], None  # run : (ts, endpoint, points) en cours de fusion
+    for ts, ep, payload in entries:
+        pts = payload.get("points") if len(payload) == 1 else None
+        is_points = isinstance(pts, list)
+        if run is not None and (not is_points or ep != run[1]):
+            rows.extend(_chunks(*run))
+            run = None
+        if not is_points:
+            rows.append((ts, ep, _dumps(payload)))
+        elif run is None:
+            run = (ts, ep, list(pts))
+        else:
+            run[2].extend(pts)
+    if run is not None:
+        rows.extend(_chunks(*run))
+    return rows
+
+
+def _flush_locked(db_path: str, extra: tuple = ()) -> int:
+    """Écrit _pending (+ extra, déjà sérialisé) en une transaction.
+
+    Appelant : _pending_lock.
+    """
+    rows = _packed(_pending)
+    rows.extend(extra)
+    if not rows:
+        return 0
+    with _transaction(db_path) as con:
+        con.executemany(_INSERT_OUTBOX, rows)
+    _pending.clear()  # seulement si l'écriture a réussi
+    return len(rows)
+
+
+def flush_pending(db_path: str) -> int:
+    """Vide le tampon mémoire dans l'outbox. Retourne le nb de lignes écrites."""
+    with _pending_lock:
+        return _flush_locked(db_path)
 
 
 def enqueue(db_path: str, endpoint: str, payload: dict) -> None:
-    with sqlite3.connect(db_path) as con:
-        con.execute(
-            "INSERT INTO outbox(ts, endpoint, payload) VALUES (?, ?, ?)",
-            (time.time(), endpoint, json.dumps(payload)),
-        )
-        con.commit()
+    enqueue_many(db_path, [(endpoint, payload)])
+
+
+def enqueue_many(db_path: str, events: Iterable[tuple[str, dict]]) -> None:
+    """Insère plusieurs événements [(endpoint, payload), ...] d'un coup.
+
+    Une seule transaction (un fsync) pour toute la rafale, ordre conservé.
+    """
+    now = time.time()
+    events = list(events)
+    if not events:
+        return
+    with _pending_lock:
+        if all(ep in _BUFFERED_ENDPOINTS for ep, _ in events):
+            _pending.extend((now, ep, p) for ep, p in events)
+        else:
+            _flush_locked(db_path, [(now, ep, _dumps(p)) for ep, p in events])
+
+
+# ── Listes d'ids ─────────────────────────────────────────────────────
+# sqlite3 garde les requêtes préparées par texte SQL exact. Un `IN (?,?,…)`
+# construit à la volée change de texte avec la taille du lot et se fait
+# re-préparer ; avec json_each(?) la requête est une constante unique et
+# la liste d'ids passe en un seul paramètre JSON.
+
+def _has_json1() -> bool:
+    con = sqlite3.connect(":memory:")
+    try:
+        con.execute("SELECT json_array()")
+        return True
+    except sqlite3.OperationalError:
+        return False
+    finally:
+        con.close()
+
+
+_HAS_JSON1 = _has_json1()
+_IDS_PARAM = "SELECT value FROM json_each(?)"
+
+
+def _execute_ids(con: sqlite3.Connection, sql: str, ids: list, *head):
+    """Exécute `sql` (filtre `id IN (_IDS_PARAM)`), head = paramètres avant."""
+    if _HAS_JSON1:
+        return con.execute(sql, (*head, json.dumps(ids)))
+    # Repli sans JSON1 : placeholders développés (texte variable)
+    return con.execute(sql.replace(_IDS_PARAM, ",".join("?" * len(ids))),
+                       (*head, *ids))
+
+
+# Bail sur les lignes remises au sync thread : invisibles pour les
+# dequeue suivants tant qu'elles ne sont ni acquittées (mark_sent), ni en
+# échec (mark_failed_batch), ni rendues (release). Si le Pi perd
+# l'alimentation pendant l'envoi, elles réapparaissent à l'expiration.
+LEASE_S = 60.0
+_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+_SQL_LEASE_RETURNING = (
+    "UPDATE outbox SET next_retry_at = ? WHERE id IN "
+    "(SELECT id FROM outbox WHERE next_retry_at <= ? "
+    "ORDER BY id ASC LIMIT ?) "
+    "RETURNING id, endpoint, payload")
+_SQL_SELECT_READY = (
+    "SELECT id, endpoint, payload FROM outbox "
+    "WHERE next_retry_at <= ? ORDER BY id ASC LIMIT ?")
+_SQL_LEASE = f"UPDATE outbox SET next_retry_at = ? WHERE id IN ({_IDS_PARAM})"
+_SQL_RELEASE = f"UPDATE outbox SET next_retry_at = 0 WHERE id IN ({_IDS_PARAM})"
+_SQL_DELETE = f"DELETE FROM outbox WHERE id IN ({_IDS_PARAM})"
+# Délai 5 s × 2^retries calculé par SQLite (décalage borné à 7, 5×128 > 600)
+_SQL_FAILED = (
+    "UPDATE outbox SET retry_count = retry_count + 1, "
+    "next_retry_at = ? + MIN(5 * (1 << MIN(retry_count + 1, 7)), 600) "
+    f"WHERE id IN ({_IDS_PARAM})")
+_SQL_COUNT = "SELECT COUNT(*) FROM outbox"
+_SQL_PURGE = (
+    "DELETE FROM outbox WHERE endpoint='telemetry' AND id <= "
+    "(SELECT id FROM outbox WHERE endpoint='telemetry' "
+    "ORDER BY id DESC LIMIT 1 OFFSET ?)")
 
 
 def dequeue_batch(db_path: str, limit: int = 50) -> list[tuple[int, str, dict]]:
-    """Retourne les messages prêts : [(id, endpoint, payload), ...]"""
+    """Retourne et loue les messages prêts : [(id, endpoint, payload), ...]"""
     now = time.time()
-    with sqlite3.connect(db_path) as con:
-        cur = con.execute(
-            "SELECT id, endpoint, payload FROM outbox "
-            "WHERE next_retry_at <= ? ORDER BY id ASC LIMIT ?",
-            (now, limit),
-        )
-        rows = cur.fetchall()
-    return [(rid, ep, json.loads(p)) for rid, ep, p in rows]
+    if _HAS_RETURNING:
+        # Lecture + prise du bail en une seule instruction
+        rows = _conn(db_path).execute(
+            _SQL_LEASE_RETURNING, (now + LEASE_S, now, limit)).fetchall()
+        rows.sort()  # ordre de RETURNING non garanti
+    else:
+        with _transaction(db_path) as con:
+            rows = con.execute(_SQL_SELECT_READY, (now, limit)).fetchall()
+            if rows:
+                _execute_ids(con, _SQL_LEASE, [r[0] for r in rows],
+                             now + LEASE_S)
+    return [(rid, ep, _loads(p)) for rid, ep, p in rows]
+
+
+def release(db_path: str, ids: Iterable[int]) -> None:
+    """Rend des lignes louées mais non tentées (renvoyées au prochain cycle)."""
+    ids = list(ids)
+    if not ids:
+        return
+    _execute_ids(_conn(db_path), _SQL_RELEASE, ids)
 
 
 def mark_sent(db_path: str, ids: Iterable[int]) -> None:
     ids = list(ids)
     if not ids:
         return
-    q = "DELETE FROM outbox WHERE id IN (%s)" % ",".join(["?"] * len(ids))
-    with sqlite3.connect(db_path) as con:
-        con.execute(q, ids)
-        con.commit()
+    _execute_ids(_conn(db_path), _SQL_DELETE, ids)
+
+
+def mark_failed_batch(db_path: str, row_ids: Iterable[int]) -> None:
+    """Incrémente retry_count + backoff exponentiel (max 600 s).
+
+    Un seul UPDATE pour toutes les lignes, délai calculé par SQLite.
+    """
+    row_ids = list(row_ids)
+    if not row_ids:
+        return
+    _execute_ids(_conn(db_path), _SQL_FAILED, row_ids, time.time())
 
 
 def mark_failed(db_path: str, row_id: int) -> None:
-    """Incrémente retry_count + backoff exponentiel (max 600 s)."""
-    with sqlite3.connect(db_path) as con:
-        cur = con.execute("SELECT retry_count FROM outbox WHERE id=?", (row_id,))
-        row = cur.fetchone()
-        if row is None:
-            return
-        retries = row[0] + 1
-        delay = min(5 * (2 ** retries), 600)
-        next_retry = time.time() + delay
-        con.execute(
-            "UPDATE outbox SET retry_count=?, next_retry_at=? WHERE id=?",
-            (retries, next_retry, row_id),
-        )
-        con.commit()
+    mark_failed_batch(db_path, [row_id])
 
 
 def queue_size(db_path: str) -> int:
-    with sqlite3.connect(db_path) as con:
-        cur = con.execute("SELECT COUNT(*) FROM outbox")
-        return cur.fetchone()[0]
+    cur = _conn(db_path).execute(_SQL_COUNT)
+    return cur.fetchone()[0] + len(_pending)
 
 
 def purge_old(db_path: str, max_items: int = 50000) -> int:
-    """Supprime les télémétriques les plus anciennes si > max_items."""
-    with sqlite3.connect(db_path) as con:
-        cur = con.execute("SELECT COUNT(*) FROM outbox")
-        total = cur.fetchone()[0]
-        if total <= max_items:
-            return 0
-        excess = total - max_items
-        con.execute(
-            "DELETE FROM outbox WHERE id IN "
-            "(SELECT id FROM outbox WHERE endpoint='telemetry' "
-            "ORDER BY id ASC LIMIT ?)",
-            (excess,),
-        )
-        con.commit()
+    """Supprime les télémétriques les plus anciennes si > max_items.
+
+    Une seule requête guidée par idx_outbox_ep_id : on ne garde que les
+    max_items télémétries les plus récentes (pas de COUNT(*) complet).
+    """
+    cur = _conn(db_path).execute(_SQL_PURGE, (max_items,))
+    excess = cur.rowcount
+    if excess > 0:
         print(f"[DB] Purge : {excess} messages supprimés")
-        return excess
+    return max(excess, 0)
 
 
 # ── Cache badges ─────────────────────────────────────────────────────
 
+_SQL_CACHE_BADGE = ("INSERT OR REPLACE INTO badge_cache "
+                    "(uid_hash, driver_id, driver_name, cached_at) VALUES (?, ?, ?, ?)")
+_SQL_LOOKUP_BADGE = "SELECT driver_id, driver_name FROM badge_cache WHERE uid_hash=?"
+
+
 def cache_badge(db_path: str, uid_hash: str, driver_id: str, driver_name: str):
-    with sqlite3.connect(db_path) as con:
-        con.execute(
-            "INSERT OR REPLACE INTO badge_cache "
-            "(uid_hash, driver_id, driver_name, cached_at) VALUES (?, ?, ?, ?)",
-            (uid_hash, driver_id, driver_name, time.time()),
-        )
-        con.commit()
+    _conn(db_path).execute(
+        _SQL_CACHE_BADGE, (uid_hash, driver_id, driver_name, time.time()))
 
 
 def lookup_badge(db_path: str, uid_hash: str) -> dict | None:
-    with sqlite3.connect(db_path) as con:
-        cur = con.execute(
-            "SELECT driver_id, driver_name FROM badge_cache WHERE uid_hash=?",
-            (uid_hash,),
-        )
-        row = cur.fetchone()
+    cur = _conn(db_path).execute(_SQL_LOOKUP_BADGE, (uid_hash,))
+    row = cur.fetchone()
     if row:
         return {"driver_id": row[0], "driver_name": row[1]}
     return None
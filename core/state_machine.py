@@ -42,7 +42,7 @@ class State:
     alcohol_start: float = 0.0
     alcohol_result: Optional[str] = None   # "pass" / "fail"
     menu_page: int = 0
-    changed_at: float = field(default_factory=time.time)
+    changed_at: float = field(default_factory=time.monotonic)  # horloge monotone
 
     def transition(self, new_state: str):
         """Change d'état et enregistre le timestamp."""
@@ -50,13 +50,13 @@ class State:
             return
         self.previous = self.current
         self.current = new_state
-        self.changed_at = time.time()
+        self.changed_at = time.monotonic()
         print(f"[STATE] {self.previous} → {self.current}")
 
     @property
     def time_in_state(self) -> float:
         """Secondes dans l'état courant."""
-        return time.time() - self.changed_at
+        return time.monotonic() - self.changed_at
 
     @property
     def is_trip(self) -> bool:
@@ -11,9 +11,20 @@ Endpoints :
   health     → POST /v1/device/health
 """
 from __future__ import annotations
+import json
+import threading
 import requests
+from requests.adapters import HTTPAdapter
 import time
 
+# ── Sérialisation du corps : orjson (C) si dispo, sinon json stdlib ──
+try:
+    import orjson  # type: ignore
+    _dumps = orjson.dumps
+except ImportError:
+    def _dumps(obj):
+        return json.dumps(obj, separators=(",", ":")).encode()
+
 ENDPOINT_PATHS = {
     "telemetry":  "/v1/ingest/telemetry",
     "nfc_auth":   "/v1/ingest/nfc_auth",
@@ -24,51 +35,96 @@ ENDPOINT_PATHS = {
     "health":     "/v1/device/health",
 }
 
+# Endpoints acceptant plusieurs éléments dans un même POST :
+# endpoint → clé de la liste dans le payload
+BULK_ENDPOINTS = {
+    "telemetry": "points",
+}
+
+# Endpoints dont l'ordre d'arrivée est indifférent au serveur : POST en
+# parallèle possibles. Les autres (alertes, trajets, auth) restent en
+# série, dans l'ordre de la queue, arrêtés au premier échec.
+CONCURRENT_ENDPOINTS = frozenset({"health"})
+
 
 class ApiClient:
     def __init__(self, api_base_url: str, kit_serial: str, kit_key: str):
         self.api_base_url = api_base_url.rstrip("/")
+        # URLs complètes précalculées une fois pour toutes
+        self._urls = {ep: f"{self.api_base_url}{path}"
+                      for ep, path in ENDPOINT_PATHS.items()}
         self.headers = {
             "X-Kit-Serial": kit_serial,
             "X-Kit-Key": kit_key,
             "Content-Type": "application/json",
         }
+        # Session persistante : keep-alive, une seule poignée de main
+        # TCP/TLS + DNS par fenêtre de sync (précieux sur modem cellulaire)
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=4, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        # Compteurs mis à jour par les threads du pool de sync
+        self._stats_lock = threading.Lock()
         self.last_ok_time = 0.0
         self.consecutive_fails = 0
 
+    def _record_ok(self):
+        with self._stats_lock:
+            self.last_ok_time = time.time()
+            self.consecutive_fails = 0
+
+    def _record_fail(self):
+        with self._stats_lock:
+            self.consecutive_fails += 1
+
     def post(self, endpoint: str, payload: dict) -> tuple[bool, str]:
         """Envoie un payload. Retourne (success, message)."""
-        path = ENDPOINT_PATHS.get(endpoint)
-        if path is None:
+        url = self._urls.get(endpoint)
+        if url is None:
             return False, f"Endpoint inconnu: {endpoint}"
 
-        url = f"{self.api_base_url}{path}"
         try:
-            r = requests.post(url, json=payload, headers=self.headers, timeout=10)
+            # Corps sérialisé une fois ; Content-Type déjà dans la session
+            r = self.session.post(url, data=_dumps(payload), timeout=10)
             if 200 <= r.status_code < 300:
                 # Vérifier aussi le champ "ok" dans le body JSON
                 try:
                     body = r.json()
                     if isinstance(body, dict) and body.get("ok") is False:
-                        self.consecutive_fails += 1
+                        self._record_fail()
                         return False, f"API error: {body.get('code', '?')} — {body.get('message', '')[:200]}"
                 except Exception:
                     pass
-                self.last_ok_time = time.time()
-                self.consecutive_fails = 0
+                self._record_ok()
                 return True, r.text
-            self.consecutive_fails += 1
+            self._record_fail()
             return False, f"{r.status_code} {r.text[:200]}"
         except requests.ConnectionError:
-            self.consecutive_fails += 1
+            self._record_fail()
             return False, "Connection refused"
         except requests.Timeout:
-            self.consecutive_fails += 1
+            self._record_fail()
             return False, "Timeout"
         except Exception as e:
-            self.consecutive_fails += 1
+            self._record_fail()
             return False, repr(e)
 
+    def post_batch(self, endpoint: str, payloads: list[dict]) -> tuple[bool, str]:
+        """Envoie plusieurs payloads d'un endpoint "bulk" en un seul POST.
+
+        Les listes (ex. "points" pour telemetry) sont concaténées dans
+        l'ordre : N lignes de la queue → 1 aller-retour HTTP.
+        """
+        key = BULK_ENDPOINTS.get(endpoint)
+        if key is None:
+            return False, f"Endpoint non groupable: {endpoint}"
+        items = []
+        for p in payloads:
+            items.extend(p.get(key, ()))
+        return self.post(endpoint, {key: items})
+
     # Raccourcis
     def post_telemetry(self, payload):
         return self.post("telemetry", payload)
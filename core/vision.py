@@ -1,8 +1,11 @@
 """
 Vision — Intégration fatigue-lite (caméra + détection fatigue).
 
-Lance le pipeline fatigue-lite dans un thread séparé.
-Expose les données de fatigue via read() (thread-safe).
+Lance le pipeline fatigue-lite dans deux threads : capture caméra
+(producteur) et traitement CV (consommateur), reliés par un double
+buffer — la lecture caméra se fait pendant l'inférence de la frame
+précédente. Expose les données de fatigue via read() : instantané immuable publié
+par simple réassignation (atomique sous le GIL), sans verrou.
 
 Gère l'isolation du module config : fatigue-lite a son propre config.py
 qui ne doit pas écraser le config.py du firmware.
@@ -12,27 +15,44 @@ import os
 import sys
 import time
 import threading
+from collections import namedtuple
 
-_lock = threading.Lock()
 _thread = None
 _stop_event = threading.Event()
 _fl_dir = None
 
-_data = {
-    "fatigue_level": 0,
-    "fatigue_level_name": "NORMAL",
-    "fatigue_nod_count": 0,
-    "fatigue_yawn_count": 0,
-    "fatigue_is_microsleep": False,
-    "fatigue_head_down_sec": 0.0,
-    "fatigue_face_detected": False,
-    "fatigue_fps": 0.0,
-    "fatigue_ok": False,
-}
+# Chargés une seule fois par init() (imports + modèle UltraFace)
+_fl_config = None
+_fl = {}          # classes fatigue-lite : Camera, HeadNodDetector, ...
+_detector = None
+
+FatigueSnapshot = namedtuple("FatigueSnapshot", [
+    "fatigue_level",
+    "fatigue_level_name",
+    "fatigue_nod_count",
+    "fatigue_yawn_count",
+    "fatigue_is_microsleep",
+    "fatigue_head_down_sec",
+    "fatigue_face_detected",
+    "fatigue_fps",
+    "fatigue_ok",
+])
+
+_data = FatigueSnapshot(
+    fatigue_level=0,
+    fatigue_level_name="NORMAL",
+    fatigue_nod_count=0,
+    fatigue_yawn_count=0,
+    fatigue_is_microsleep=False,
+    fatigue_head_down_sec=0.0,
+    fatigue_face_detected=False,
+    fatigue_fps=0.0,
+    fatigue_ok=False,
+)
 
 
 def init(fatigue_lite_dir: str = None) -> bool:
-    """Localise fatigue-lite/. Ne lance pas encore le pipeline."""
+    """Localise et charge fatigue-lite/. Ne lance pas encore le pipeline."""
     global _fl_dir
 
     if fatigue_lite_dir is None:
@@ -53,24 +73,12 @@ def init(fatigue_lite_dir: str = None) -> bool:
 
     _fl_dir = fatigue_lite_dir
     print(f"[VISION] fatigue-lite trouvé : {_fl_dir}")
-    return True
-
-
-def start() -> bool:
-    """Lance le pipeline dans un thread dédié."""
-    global _thread
-    if _fl_dir is None:
-        return False
-    _stop_event.clear()
-    _thread = threading.Thread(target=_fatigue_loop, daemon=True, name="fatigue")
-    _thread.start()
-    print("[VISION] Pipeline fatigue démarré")
-    return True
+    return _load_fatigue_lite()
 
 
-def _fatigue_loop():
-    """Thread : caméra → face → nod → yawn → fusion (boucle continue)."""
-    global _data
+def _load_fatigue_lite() -> bool:
+    """Imports fatigue-lite + chargement du modèle, une fois au boot."""
+    global _fl_config, _detector
     import importlib.util
 
     # ── Charger le config de fatigue-lite sans écraser celui du firmware ──
@@ -80,48 +88,136 @@ def _fatigue_loop():
     spec = importlib.util.spec_from_file_location("config", fl_config_path)
     fl_config = importlib.util.module_from_spec(spec)
     sys.modules["config"] = fl_config
-    spec.loader.exec_module(fl_config)
 
     # Ajouter fatigue-lite au path pour les imports
     if _fl_dir not in sys.path:
         sys.path.insert(0, _fl_dir)
 
     try:
+        spec.loader.exec_module(fl_config)
         from camera import Camera
         from face_detector import UltraFaceDetector
         from head_nod import HeadNodDetector
         from yawn_detector import YawnDetector
         from fatigue_fusion import FatigueFusion
-    except ImportError as e:
-        print(f"[VISION] Import échoué: {e}")
+        detector = UltraFaceDetector()
+    except Exception as e:
+        print(f"[VISION] Chargement fatigue-lite échoué: {e}")
+        return False
+    finally:
+        # Restaurer le config firmware pour le reste de l'app
         if firmware_config:
             sys.modules["config"] = firmware_config
-        return
 
-    # Restaurer le config firmware pour le reste de l'app
-    if firmware_config:
-        sys.modules["config"] = firmware_config
+    _fl_config = fl_config
+    _fl.update(Camera=Camera, UltraFaceDetector=UltraFaceDetector,
+               HeadNodDetector=HeadNodDetector, YawnDetector=YawnDetector,
+               FatigueFusion=FatigueFusion)
+    _detector = detector
+    return True
+
+
+def start() -> bool:
+    """Lance le pipeline dans un thread dédié."""
+    global _thread
+    if _detector is None:
+        return False
+    _stop_event.clear()
+    _thread = threading.Thread(target=_fatigue_loop, daemon=True, name="fatigue")
+    _thread.start()
+    print("[VISION] Pipeline fatigue démarré")
+    return True
+
 
-    # ── Init pipeline ────────────────────────────────────────────────
+class _FrameExchange:
+    """Double buffer producteur/consommateur (la dernière frame gagne).
+
+    Le thread capture écrit toujours dans le buffer que le traitement ne
+    détient pas ; publier une frame remplace une frame non consommée.
+    """
+
+    def __init__(self):
+        self.bufs = [None, None]
+        self._cond = threading.Condition()
+        self._ready = None  # indice publié, pas encore pris
+        self._busy = None   # indice détenu par le traitement
+
+    def write_index(self) -> int:
+        with self._cond:
+            free = [i for i in (0, 1) if i != self._busy and i != self._ready]
+            idx = free[0] if free else (1 - self._busy)
+            if self._ready == idx:
+                self._ready = None  # écrasée par la frame suivante
+            return idx
+
+    def publish(self, idx: int, frame) -> None:
+        with self._cond:
+            self.bufs[idx] = frame
+            self._ready = idx
+            self._cond.notify()
+
+    def take(self, timeout: float = 0.5):
+        """Rend le buffer précédent et attend la prochaine frame (ou None)."""
+        with self._cond:
+            self._busy = None
+            if self._ready is None:
+                self._cond.wait(timeout)
+                if self._ready is None:
+                    return None
+            self._busy, self._ready = self._ready, None
+            return self.bufs[self._busy]
+
+
+def _capture_loop(cam, xchg: _FrameExchange):
+    """Thread producteur : lit la caméra dans le buffer libre."""
+    while not _stop_event.is_set():
+        idx = xchg.write_index()
+        ok, frame = cam.read(dst=xchg.bufs[idx])
+        if not ok or frame is None:
+            time.sleep(0.1)
+            continue
+        xchg.publish(idx, frame)
+
+
+def _fatigue_loop():
+    """Thread : face → nod → yawn → fusion sur les frames du thread capture."""
+    # ── Init pipeline (modèle déjà chargé par init) ──────────────────
     try:
-        cam = Camera(source=0)
-        detector = UltraFaceDetector()
-        nod_det = HeadNodDetector()
-        yawn_det = YawnDetector()
-        fusion = FatigueFusion()
+        cam = _fl["Camera"](source=0)
+        nod_det = _fl["HeadNodDetector"]()
+        yawn_det = _fl["YawnDetector"]()
+        fusion = _fl["FatigueFusion"]()
     except Exception as e:
         print(f"[VISION] Init pipeline échoué: {e}")
         return
 
+    xchg = _FrameExchange()
+    capture = threading.Thread(target=_capture_loop, args=(cam, xchg),
+                               daemon=True, name="fatigue-capture")
+    capture.start()
+
+    try:
+        _process(xchg, _fl_config, _detector, nod_det, yawn_det, fusion)
+    finally:
+        _stop_event.set()
+        capture.join(timeout=2)
+        cam.release()
+    print("[VISION] Pipeline fatigue arrêté")
+
+
+def _process(xchg, fl_config, detector, nod_det, yawn_det, fusion):
+    """Consommateur : calibration puis boucle de détection."""
+    global _data
+    UltraFaceDetector = _fl["UltraFaceDetector"]
+
     # ── Calibration (5 s) ────────────────────────────────────────────
     print("[VISION] Calibration...")
-    t_start = time.time()
-    while time.time() - t_start < fl_config.CALIBRATION_SEC:
+    t_start = time.monotonic()
+    while time.monotonic() - t_start < fl_config.CALIBRATION_SEC:
         if _stop_event.is_set():
-            cam.release()
             return
-        ok, frame = cam.read()
-        if not ok or frame is None:
+        frame = xchg.take()
+        if frame is None:
             continue
         img_h = frame.shape[0]
         dets = detector.detect(frame)
@@ -137,41 +233,89 @@ def _fatigue_loop():
 
     # ── Boucle détection ─────────────────────────────────────────────
     import cv2
+    import numpy as np
     fps_alpha = 0.9
     fps = 0.0
+    t_prev = time.perf_counter()
     frame_count = 0
+    detect_every = max(1, fl_config.DETECT_EVERY_N)
+    # Deux dernières détections réelles : (indice frame, bbox) — pour
+    # extrapoler linéairement la boîte sur les frames sans détection
+    last_det = prev_det = None
+    det_buf = None  # buffer réduit réutilisé (recréé si la taille change)
+    mouth_buf = None  # ROI bouche réutilisé tant que sa taille ne change pas
+    # Siège vide : au-delà de NO_FACE_IDLE_SEC sans visage, seule une
+    # frame sur NO_FACE_DETECT_EVERY est traitée (détection + fusion)
+    idle_after = fl_config.NO_FACE_IDLE_SEC
+    idle_every = max(1, fl_config.NO_FACE_DETECT_EVERY)
+    no_face_since = None
+    idle_tick = 0
 
     while not _stop_event.is_set():
-        t0 = time.time()
-
-        ok, frame = cam.read()
-        if not ok or frame is None:
-            time.sleep(0.1)
+        frame = xchg.take()
+        if frame is None:
             continue
 
+        # Jamais en veille tête basse : la perte du visage peut être un
+        # microsommeil, que nod_det doit voir à chaque frame
+        if (no_face_since is not None and nod_det.down_since is None
+                and time.monotonic() - no_face_since > idle_after):
+            idle_tick += 1
+            if idle_tick % idle_every:
+                continue
+
         img_h, img_w = frame.shape[:2]
 
-        # Détection visage
-        if img_w > fl_config.DETECT_WIDTH * 1.5:
-            scale = fl_config.DETECT_WIDTH / img_w
-            det_frame = cv2.resize(frame, None, fx=scale, fy=scale)
+        if last_det is not None and frame_count % detect_every != 0:
+            # Frame intermédiaire : pas d'inférence, boîte extrapolée
+            # (la boîte n'a qu'au plus N-1 frames d'âge, jamais d'échec caché)
+            idx, face_box = last_det
+            if prev_det is not None:
+                pidx, pbox = prev_det
+                face_box = face_box.copy()
+                face_box[:4] += (face_box[:4] - pbox[:4]) * ((frame_count - idx) / (idx - pidx))
         else:
-            det_frame = frame
-            scale = 1.0
-
-        dets = detector.detect(det_frame)
-        if scale != 1.0 and len(dets) > 0:
-            dets[:, :4] /= scale
-
-        face_box = UltraFaceDetector.largest_face(dets)
+            # Détection visage
+            if img_w > fl_config.DETECT_WIDTH * 1.5:
+                scale = fl_config.DETECT_WIDTH / img_w
+                dsize = (int(img_w * scale), int(img_h * scale))
+                if det_buf is None or det_buf.shape[1::-1] != dsize:
+                    det_buf = np.empty((dsize[1], dsize[0], 3), dtype=np.uint8)
+                det_frame = cv2.resize(frame, dsize, dst=det_buf,
+                                       interpolation=cv2.INTER_LINEAR)
+            else:
+                det_frame = frame
+                scale = 1.0
+
+            dets = detector.detect(det_frame)
+            if scale != 1.0 and len(dets) > 0:
+                dets[:, :4] /= scale
+
+            face_box = UltraFaceDetector.largest_face(dets)
+            if face_box is None:
+                last_det = prev_det = None
+            else:
+                # Trou de plus d'un cycle → vitesse non fiable
+                if last_det is not None and frame_count - last_det[0] <= detect_every:
+                    prev_det = last_det
+                else:
+                    prev_det = None
+                last_det = (frame_count, face_box)
         face_detected = face_box is not None
+        if face_detected:
+            no_face_since = None
+            idle_tick = 0
+        elif no_face_since is None:
+            no_face_since = time.monotonic()
 
         # Head nod
         nod_det.update(face_box, img_h)
 
         # Bâillement
         if face_box is not None:
-            mouth = yawn_det.extract_mouth_roi(frame, face_box)
+            mouth = yawn_det.extract_mouth_roi(frame, face_box, out=mouth_buf)
+            if mouth is not None:
+                mouth_buf = mouth
             yawn_det.update(mouth)
 
         # Fusion
@@ -183,33 +327,35 @@ def _fatigue_loop():
         )
 
         # FPS
-        dt = time.time() - t0
-        ifps = 1.0 / dt if dt > 0 else 0
-        fps = fps * fps_alpha + ifps * (1 - fps_alpha) if frame_count > 0 else ifps
+        # FPS = cadence réelle de sortie (intervalle entre deux frames traitées)
+        t_now = time.perf_counter()
+        ifps = 1.0 / max(t_now - t_prev, 1e-6)
+        t_prev = t_now
+        fps = fps * fps_alpha + ifps * (1 - fps_alpha) if frame_count else ifps
         frame_count += 1
 
-        # Mise à jour thread-safe
-        with _lock:
-            _data = {
-                "fatigue_level": level,
-                "fatigue_level_name": fusion.level_name,
-                "fatigue_nod_count": nod_det.nod_count,
-                "fatigue_yawn_count": yawn_det.yawn_count,
-                "fatigue_is_microsleep": nod_det.is_microsleep,
-                "fatigue_head_down_sec": round(nod_det.head_down_duration, 1),
-                "fatigue_face_detected": face_detected,
-                "fatigue_fps": round(fps, 1),
-                "fatigue_ok": True,
-            }
-
-    cam.release()
-    print("[VISION] Pipeline fatigue arrêté")
+        # Publication : une seule réassignation, lecteurs jamais bloqués
+        _data = FatigueSnapshot(
+            level,
+            fusion.level_name,
+            nod_det.nod_count,
+            yawn_det.yawn_count,
+            nod_det.is_microsleep,
+            round(nod_det.head_down_duration, 1),
+            face_detected,
+            round(fps, 1),
+            True,
+        )
 
 
 def read() -> dict:
     """Retourne les données fatigue courantes."""
-    with _lock:
-        return dict(_data)
+    return _data._asdict()
+
+
+def is_running() -> bool:
+    """True dès que le pipeline a publié un premier résultat."""
+    return _data.fatigue_ok
 
 
 def stop():
@@ -1,5 +1,5 @@
 """
-Driver Boutons — 4 boutons poussoir avec debounce (polling).
+Driver Boutons — 4 boutons poussoir avec debounce (interruptions / polling).
 
 Câblage : chaque bouton entre GPIO et GND (pull-up interne).
   BTN_START (▶) : GPIO 5
@@ -8,19 +8,39 @@ Câblage : chaque bouton entre GPIO et GND (pull-up interne).
   BTN_BACK  (↩) : GPIO 19
 
 Appui = GPIO LOW (pull-up interne activé).
-Debounce logiciel 200 ms.
-Mode polling (compatible Pi Zero 2W / kernels récents).
+Debounce 200 ms, fait une seule fois : par le kernel (gpiod), par
+RPi.GPIO (bouncetime) ou, en polling, côté Python.
+
+Backends, par ordre de préférence :
+  1. libgpiod v2 (/dev/gpiochip0) : les 4 lignes demandées en une seule
+     requête, fronts + debounce gérés par le kernel, lus par un thread
+     bloqué sur le descripteur d'événements.
+  2. RPi.GPIO : front descendant par interruption (add_event_detect +
+     callback). Si la détection de front est refusée (certains kernels
+     récents), la pin repasse en polling.
+Aucun réveil CPU tant qu'aucun bouton n'est pressé ; wait() permet à la
+boucle principale de dormir jusqu'au prochain appui (ou son timeout).
 """
 from __future__ import annotations
+import array
+import threading
 import time
 from collections import deque
 
+GPIOCHIP = "/dev/gpiochip0"
+
 _gpio = None
+_gpiod_req = None     # requête libgpiod v2 (backend 1)
+_gpiod_thread = None
 _initialized = False
 _event_queue: deque = deque(maxlen=32)
+_press_event = threading.Event()    # levé à chaque événement mis en file
 _pins = {}
-_last_press = {}
+_pin_idx = {}                       # pin → indice (tableaux ci-dessous)
+_pin_names: tuple = ()              # indice → nom du bouton
+_last_press_ns = array.array("q")   # indice → time.monotonic_ns() du dernier appui
 _prev_state = {}  # état précédent de chaque pin (HIGH/LOW)
+_polled_pins = {}  # pins sans détection de front → scannées par poll()
 
 BTN_START = "start"
 BTN_STOP  = "stop"
@@ -28,30 +48,120 @@ BTN_MENU  = "menu"
 BTN_BACK  = "back"
 
 DEBOUNCE_S = 0.2  # 200 ms
+_DEBOUNCE_NS = int(DEBOUNCE_S * 1_000_000_000)
+
+
+def _index_pins():
+    """Construit les tables indexées à partir de _pins (appelé par init)."""
+    global _pin_idx, _pin_names, _last_press_ns
+    _pin_idx = {pin: i for i, pin in enumerate(_pins)}
+    _pin_names = tuple(_pins.values())
+    _last_press_ns = array.array("q", [-_DEBOUNCE_NS] * len(_pins))
+
+
+def _on_press(pin):
+    """Callback RPi.GPIO / gpiod sur front descendant.
+
+    Pas de second debounce ici : bouncetime (RPi.GPIO) ou debounce_period
+    (kernel, gpiod) filtre déjà les rebonds avant l'appel.
+    """
+    i = _pin_idx.get(pin)
+    if i is not None:
+        _event_queue.append((_pin_names[i], time.monotonic_ns()))
+        _press_event.set()
+
+
+def _on_polled_press(pin):
+    """Front vu par polling : seul chemin sans debounce en amont."""
+    i = _pin_idx[pin]
+    now = time.monotonic_ns()
+    if now - _last_press_ns[i] < _DEBOUNCE_NS:
+        return
+    _last_press_ns[i] = now
+    _event_queue.append((_pin_names[i], now))
+    _press_event.set()
+
+
+def _gpiod_reader():
+    """Thread : bloque sur les fronts libgpiod et alimente la file."""
+    from datetime import timedelta
+    timeout = timedelta(seconds=0.5)  # pour voir passer cleanup()
+    while _initialized and _gpiod_req is not None:
+        try:
+            if _gpiod_req.wait_edge_events(timeout):
+                for ev in _gpiod_req.read_edge_events():
+                    _on_press(ev.line_offset)
+        except Exception as e:
+            print(f"[BTN] Lecture gpiod interrompue: {e}")
+            return
+
+
+def _init_gpiod() -> bool:
+    """Backend libgpiod v2. Retourne False si indisponible."""
+    global _gpiod_req, _gpiod_thread, _initialized
+    try:
+        import gpiod  # type: ignore
+        from gpiod.line import Bias, Direction, Edge  # type: ignore
+    except ImportError:
+        return False
+    if not hasattr(gpiod, "request_lines"):  # libgpiod v1 : API différente
+        return False
+    from datetime import timedelta
+    try:
+        settings = gpiod.LineSettings(
+            direction=Direction.INPUT,
+            bias=Bias.PULL_UP,
+            edge_detection=Edge.FALLING,
+            debounce_period=timedelta(seconds=DEBOUNCE_S),
+        )
+        _gpiod_req = gpiod.request_lines(
+            GPIOCHIP, consumer="zoum-buttons",
+            config={tuple(_pins): settings},
+        )
+    except OSError as e:
+        print(f"[BTN] gpiod indisponible ({e}) → RPi.GPIO")
+        return False
+
+    _initialized = True
+    _gpiod_thread = threading.Thread(target=_gpiod_reader, daemon=True,
+                                     name="buttons")
+    _gpiod_thread.start()
+    print(f"[BTN] 4 boutons initialisés (gpiod) : {list(_pins.values())}")
+    return True
 
 
 def init(pin_start: int = 5, pin_stop: int = 6, pin_menu: int = 13, pin_back: int = 19) -> bool:
-    global _gpio, _initialized, _pins
+    global _gpio, _initialized, _pins, _polled_pins
+    _pins = {
+        pin_start: BTN_START,
+        pin_stop:  BTN_STOP,
+        pin_menu:  BTN_MENU,
+        pin_back:  BTN_BACK,
+    }
+    _index_pins()
+    if _init_gpiod():
+        return True
     try:
         import RPi.GPIO as GPIO
         _gpio = GPIO
         _gpio.setwarnings(False)
         _gpio.setmode(_gpio.BCM)
 
-        _pins = {
-            pin_start: BTN_START,
-            pin_stop:  BTN_STOP,
-            pin_menu:  BTN_MENU,
-            pin_back:  BTN_BACK,
-        }
-
-        for pin in _pins:
+        _polled_pins = {}
+        for pin, name in _pins.items():
             _gpio.setup(pin, _gpio.IN, pull_up_down=_gpio.PUD_UP)
-            _last_press[pin] = 0.0
             _prev_state[pin] = _gpio.HIGH  # bouton relâché
+            try:
+                _gpio.add_event_detect(pin, _gpio.FALLING, callback=_on_press,
+                                       bouncetime=int(DEBOUNCE_S * 1000))
+            except RuntimeError:
+                _polled_pins[pin] = name  # "Failed to add edge detection"
 
         _initialized = True
-        print(f"[BTN] 4 boutons initialisés (polling) : {list(_pins.values())}")
+        mode = "polling" if _polled_pins else "interruptions"
+        if _polled_pins and len(_polled_pins) < len(_pins):
+            mode = "mixte"
+        print(f"[BTN] 4 boutons initialisés ({mode}) : {list(_pins.values())}")
         return True
     except Exception as e:
         print(f"[BTN] Init échoué: {e}")
@@ -61,23 +171,38 @@ def init(pin_start: int = 5, pin_stop: int = 6, pin_menu: int = 13, pin_back: in
 
 
 def _scan():
-    """Lit l'état de chaque pin et détecte les fronts descendants (press)."""
-    if not _initialized or _gpio is None:
+    """Lit l'état des pins sans interruption et détecte les fronts descendants."""
+    if not _initialized or _gpio is None or not _polled_pins:
         return
-    now = time.time()
-    for pin, name in _pins.items():
+    for pin in _polled_pins:
         current = _gpio.input(pin)
         prev = _prev_state.get(pin, _gpio.HIGH)
 
         # Front descendant : HIGH → LOW = bouton pressé
         if prev == _gpio.HIGH and current == _gpio.LOW:
-            if now - _last_press.get(pin, 0) >= DEBOUNCE_S:
-                _last_press[pin] = now
-                _event_queue.append((name, now))
+            _on_polled_press(pin)
 
         _prev_state[pin] = current
 
 
+def needs_polling() -> bool:
+    """True si des pins sont en polling : un appui n'est vu qu'au poll()."""
+    return _initialized and bool(_polled_pins)
+
+
+def wait(timeout: float) -> bool:
+    """Dort jusqu'à `timeout` s, réveillé plus tôt par un appui.
+
+    Retourne True si un événement attend dans la file. Les pins en
+    polling ne réveillent pas : elles sont vues au poll() suivant.
+    """
+    if _event_queue:
+        return True
+    fired = _press_event.wait(timeout)
+    _press_event.clear()  # la file fait foi, l'Event ne sert qu'au réveil
+    return fired
+
+
 def poll() -> str | None:
     """Scanne les pins puis retourne le prochain événement, ou None."""
     _scan()
@@ -90,23 +215,44 @@ def poll() -> str | None:
 def poll_all() -> list[str]:
     """Retourne tous les événements en attente."""
     _scan()
-    events = []
-    while _event_queue:
-        name, _ts = _event_queue.popleft()
-        events.append(name)
-    return events
+    # Longueur figée avant de vider : un callback qui ajoute pendant ce
+    # temps garde son événement pour le prochain appel
+    popleft = _event_queue.popleft
+    return [popleft()[0] for _ in range(len(_event_queue))]
 
 
 def is_pressed(button_name: str) -> bool:
     """Vérifie si un bouton est actuellement enfoncé."""
-    if not _initialized or _gpio is None:
+    if not _initialized:
         return False
     for pin, name in _pins.items():
         if name == button_name:
+            if _gpiod_req is not None:
+                from gpiod.line import Value  # type: ignore
+                return _gpiod_req.get_value(pin) == Value.INACTIVE
+            if _gpio is None:
+                return False
             return _gpio.input(pin) == _gpio.LOW
     return False
 
 
 def cleanup():
-    global _initialized
+    global _initialized, _gpiod_req
+    if _gpiod_req is not None:
+        _initialized = False
+        if _gpiod_thread is not None:
+            _gpiod_thread.join(timeout=1.0)
+        try:
+            _gpiod_req.release()
+        except Exception:
+            pass
+        _gpiod_req = None
+        return
+    if _initialized and _gpio is not None:
+        for pin in _pins:
+            if pin not in _polled_pins:
+                try:
+                    _gpio.remove_event_detect(pin)
+                except Exception:
+                    pass
     _initialized = False
@@ -1,11 +1,28 @@
 """
-Driver OLED SSD1306 - Affichage 128x64 I2C.
+Driver OLED SSD1306 - Affichage 128x64 I2C (ou SPI).
+
+Bus : I2C 400 kHz par défaut (partagé avec le PN532). En SPI0 matériel
+(OLED_BUS=spi) une trame complète passe en ~1 ms au lieu de ~26 ms ;
+câblage : MOSI=GPIO10, SCLK=GPIO11, CS=GPIO8 (CE0), DC=GPIO25,
+RST=GPIO16 (DC/RST/CS réglables dans config). Le SPI n'acquitte rien :
+un écran absent ne se détecte pas, d'où le choix explicite du bus.
 
 Écrans contextuels selon l'état de la machine :
   BOOT, READY, AUTH_NFC, ALCOHOL, TRIP_ACTIVE, MENU, WARNING
+
+Les screen_* ne dessinent pas dans le thread appelant : ils déposent la
+demande, et un thread de rendu affiche la plus récente à 20 Hz max
+(les demandes intermédiaires sont sautées).
 """
 from __future__ import annotations
+import functools
 import threading
+import time
+
+try:
+    import numpy as np
+except ImportError:  # repli : conversion pixel par pixel d'adafruit
+    np = None
 
 _oled = None
 _initialized = False
@@ -13,50 +30,183 @@ _lock = threading.Lock()
 
 W, H = 128, 64
 
+# Toile PIL unique réutilisée par tous les écrans (créée au 1er dessin)
+_img = None
+_canvas = None
+_font = None
+
+# Pages (8 × 128 octets) réellement affichées, pour n'envoyer que la
+# zone modifiée. None = contenu écran inconnu → prochain envoi complet.
+_sent = None
+
+# Rendu asynchrone : dernière demande (fn, args, kwargs) + réveil
+RENDER_PERIOD_S = 0.05  # 20 Hz max
+_pending = None
+_pending_lock = threading.Lock()  # _pending / _clears : main ↔ thread oled
+_render_event = threading.Event()
+_render_thread = None
+# Compteur de clear() : un rendu pris avant le dernier clear() n'est
+# pas envoyé (sinon l'ancien écran réapparaît après l'effacement)
+_clears = 0
+_render_gen = 0
+
+@functools.lru_cache(maxsize=256)  # libellés fixes redessinés à chaque écran
 def safe_text(txt):
     return str(txt).replace("—", "-").encode("ascii", errors="replace").decode()
 
-def init() -> bool:
+def init(bus: str = "i2c", pin_dc: int = 25, pin_rst: int = 16,
+         pin_cs: int = 8, spi_hz: int = 8_000_000) -> bool:
     global _oled, _initialized
     try:
         import board
         import adafruit_ssd1306
-        i2c = board.I2C()
-        _oled = adafruit_ssd1306.SSD1306_I2C(W, H, i2c)
+        if bus == "spi":
+            try:
+                _oled = _init_spi(board, adafruit_ssd1306, pin_dc, pin_rst, pin_cs, spi_hz)
+            except Exception as e:
+                print(f"[OLED] SPI échoué ({e}), repli I2C")
+                bus = "i2c"
+        if bus != "spi":
+            i2c = board.I2C()  # singleton partagé avec le PN532 (drivers/nfc.py)
+            _oled = adafruit_ssd1306.SSD1306_I2C(W, H, i2c)
         _oled.fill(0)
         _oled.show()
         _initialized = True
-        print(f"[OLED] SSD1306 initialisé ({W}x{H})")
+        print(f"[OLED] SSD1306 initialisé ({W}x{H}, {bus.upper()})")
         return True
     except Exception as e:
         print(f"[OLED] Init échoué: {e}")
         return False
 
+def _init_spi(board, adafruit_ssd1306, pin_dc, pin_rst, pin_cs, spi_hz):
+    import digitalio
+    pin = lambda n: digitalio.DigitalInOut(getattr(board, f"D{n}"))
+    return adafruit_ssd1306.SSD1306_SPI(
+        W, H, board.SPI(), pin(pin_dc), pin(pin_rst), pin(pin_cs), baudrate=spi_hz)
+
+def _write_data(data: bytes):
+    """Écrit des octets de données GDDRAM (hors commandes) sur le bus."""
+    if hasattr(_oled, "i2c_device"):
+        with _oled.i2c_device:
+            _oled.i2c_device.write(b"\x40" + data)  # préfixe "data" I2C
+    else:
+        _oled.dc_pin.value = 1  # SPI : DC haut = données
+        with _oled.spi_device as spi:
+            spi.write(data)
+
 def _draw():
-    from PIL import Image, ImageDraw, ImageFont
-    img = Image.new("1", (W, H))
-    draw = ImageDraw.Draw(img)
-    font = ImageFont.load_default()
-    return img, draw, font
+    """Retourne (img, draw, font) : la toile partagée, effacée."""
+    global _img, _canvas, _font
+    if _img is None:
+        from PIL import Image, ImageDraw, ImageFont
+        _img = Image.new("1", (W, H))
+        _canvas = ImageDraw.Draw(_img)
+        _font = ImageFont.load_default()
+    else:
+        _canvas.rectangle([(0, 0), (W - 1, H - 1)], fill=0)
+    return _img, _canvas, _font
+
+def _blit(img):
+    """Copie l'image PIL "1" dans le buffer SSD1306 sans boucle Python.
+
+    Layout SSD1306 : 8 pages de 128 octets, bit k d'un octet = ligne
+    8*page + k de la colonne. np.packbits(bitorder="little") sur l'axe
+    des 8 lignes d'une page produit exactement cet ordre.
+    """
+    pages = np.packbits(np.asarray(img).reshape(H // 8, 8, W),
+                        axis=1, bitorder="little").reshape(H // 8, W)
+    buf = _oled.buffer
+    off = len(buf) - (W * H // 8)  # I2C : 1er octet = préfixe data 0x40 (SPI : 0)
+    np.frombuffer(buf, dtype=np.uint8)[off:] = pages.reshape(-1)
+    return pages
+
+def _push(pages):
+    """Envoie seulement le rectangle (pages × colonnes) qui a changé.
+
+    Fenêtre SSD1306 : 0x21 col_début col_fin, 0x22 page_début page_fin,
+    puis les octets de la zone en adressage horizontal. Un compte à
+    rebours ne transfère ainsi que quelques dizaines d'octets au lieu
+    de 1024.
+    """
+    global _sent
+    if _sent is None:
+        _oled.show()
+        _sent = pages.copy()
+        return
+    diff = pages != _sent
+    if not diff.any():
+        return
+    rows = np.flatnonzero(diff.any(axis=1))
+    cols = np.flatnonzero(diff.any(axis=0))
+    p0, p1 = int(rows[0]), int(rows[-1])
+    x0, x1 = int(cols[0]), int(cols[-1])
+    for cmd in (0x21, x0, x1, 0x22, p0, p1):
+        _oled.write_cmd(cmd)
+    _write_data(pages[p0:p1 + 1, x0:x1 + 1].tobytes())
+    _sent[p0:p1 + 1, x0:x1 + 1] = pages[p0:p1 + 1, x0:x1 + 1]
 
 def _show(img):
+    global _sent
     if _oled is None:
         return
     with _lock:
+        if _render_gen != _clears:
+            return  # effacé pendant le rendu
         try:
-            _oled.image(img)
-            _oled.show()
+            if np is not None:
+                _push(_blit(img))
+            else:
+                _oled.image(img)
+                _oled.show()
         except Exception:
-            pass
+            _sent = None  # état écran incertain → renvoi complet
+
+def _render_loop():
+    """Thread : dessine la dernière demande d'écran, au plus à 20 Hz."""
+    global _pending, _render_gen
+    while True:
+        _render_event.wait()
+        _render_event.clear()
+        with _pending_lock:
+            req, _pending = _pending, None
+            _render_gen = _clears
+        if req is None:
+            continue
+        fn, args, kwargs = req
+        try:
+            fn(*args, **kwargs)
+        except Exception as e:
+            print(f"[OLED] Rendu {fn.__name__} échoué: {e}")
+        time.sleep(RENDER_PERIOD_S)
+
+def _coalesced(fn):
+    """Décorateur : l'appel dépose (fn, args) pour le thread de rendu."""
+    @functools.wraps(fn)
+    def request(*args, **kwargs):
+        global _pending, _render_thread
+        with _pending_lock:
+            _pending = (fn, args, kwargs)
+        if _render_thread is None:
+            _render_thread = threading.Thread(target=_render_loop,
+                                              daemon=True, name="oled")
+            _render_thread.start()
+        _render_event.set()
+    return request
 
 def clear():
+    global _sent, _pending, _clears
+    with _pending_lock:
+        _pending = None  # une demande en attente ne doit pas réafficher
+        _clears += 1     # ni un rendu déjà en cours
     if _oled:
         with _lock:
             _oled.fill(0)
             _oled.show()
+            _sent = None
 
 # ── Écrans ───────────────────────────────────────────────────────────
 
+@_coalesced
 def screen_boot(serial: str, version: str = "1.0.0", progress: dict = None):
     img, draw, font = _draw()
     draw.text((20, 2), safe_text("ZOUM AI"), font=font, fill=255)
@@ -65,15 +215,13 @@ def screen_boot(serial: str, version: str = "1.0.0", progress: dict = None):
     draw.text((0, 30), safe_text(f"Firmware v{version}"), font=font, fill=255)
     if progress:
         y = 42
-        icons = ""
-        for name, ok in progress.items():
-            tag = "+" if ok else "-"
-            icons += f"{name}:{tag} "
+        icons = "".join(f"{name}:{'+' if ok else '-'} " for name, ok in progress.items())
         draw.text((0, y), safe_text(icons[:21]), font=font, fill=255)
         if len(icons) > 21:
             draw.text((0, y + 10), safe_text(icons[21:42]), font=font, fill=255)
     _show(img)
 
+@_coalesced
 def screen_ready(driver: str = "-", gps_fix: bool = False, gps_sats: int = 0,
                  network: str = "OFFLINE", rssi: int = 0,
                  temp_c: float = None, queue_size: int = 0):
@@ -94,6 +242,7 @@ def screen_ready(driver: str = "-", gps_fix: bool = False, gps_sats: int = 0,
     draw.text((72, 52), safe_text("[>]Start"), font=font, fill=255)
     _show(img)
 
+@_coalesced
 def screen_auth_nfc(blink: bool = False):
     img, draw, font = _draw()
     draw.rectangle([(0, 0), (W, 12)], fill=255)
@@ -107,6 +256,7 @@ def screen_auth_nfc(blink: bool = False):
     draw.text((12, 54), safe_text("Presentez badge"), font=font, fill=255)
     _show(img)
 
+@_coalesced
 def screen_auth_result(success: bool, name: str = ""):
     img, draw, font = _draw()
     if success:
@@ -119,6 +269,7 @@ def screen_auth_result(success: bool, name: str = ""):
         draw.text((15, 50), safe_text("[<] Retour"), font=font, fill=255)
     _show(img)
 
+@_coalesced
 def screen_alcohol_warmup(elapsed_s: float, total_s: float):
     img, draw, font = _draw()
     draw.rectangle([(0, 0), (W, 12)], fill=255)
@@ -131,6 +282,7 @@ def screen_alcohol_warmup(elapsed_s: float, total_s: float):
     draw.text((48, 50), safe_text(f"{remain:.0f}s"), font=font, fill=255)
     _show(img)
 
+@_coalesced
 def screen_alcohol_blow(countdown_s: float):
     img, draw, font = _draw()
     draw.rectangle([(0, 0), (W, 12)], fill=255)
@@ -140,6 +292,7 @@ def screen_alcohol_blow(countdown_s: float):
     draw.text((50, 50), safe_text(f"{countdown_s:.0f}s"), font=font, fill=255)
     _show(img)
 
+@_coalesced
 def screen_alcohol_pass():
     img, draw, font = _draw()
     draw.text((30, 8), safe_text("RESULTAT"), font=font, fill=255)
@@ -148,6 +301,7 @@ def screen_alcohol_pass():
     draw.text((16, 50), safe_text("[>] Demarrer"), font=font, fill=255)
     _show(img)
 
+@_coalesced
 def screen_alcohol_fail():
     img, draw, font = _draw()
     draw.rectangle([(0, 0), (W, H)], fill=255)
@@ -157,6 +311,7 @@ def screen_alcohol_fail():
     draw.text((2, 52), safe_text("[>]Refaire [<]Quit"), font=font, fill=0)
     _show(img)
 
+@_coalesced
 def screen_trip(speed_kmh: float = 0, gps_fix: bool = False,
                 network: str = "-", queue_size: int = 0,
                 fatigue_level: int = 0, elapsed_min: float = 0):
@@ -175,6 +330,7 @@ def screen_trip(speed_kmh: float = 0, gps_fix: bool = False,
     draw.text((72, 52), safe_text("[S]Stop"), font=font, fill=255)
     _show(img)
 
+@_coalesced
 def screen_stop_confirm():
     img, draw, font = _draw()
     draw.text((8, 10), safe_text("Terminer trajet ?"), font=font, fill=255)
@@ -184,6 +340,7 @@ def screen_stop_confirm():
     draw.text((72, 34), safe_text("[<]Non"), font=font, fill=255)
     _show(img)
 
+@_coalesced
 def screen_warning_lock(message: str = "Ne conduisez pas"):
     img, draw, font = _draw()
     draw.rectangle([(0, 0), (W, H)], fill=255)
@@ -196,6 +353,7 @@ def screen_warning_lock(message: str = "Ne conduisez pas"):
     draw.text((2, 52), safe_text("[>]Refaire [<]Quit"), font=font, fill=0)
     _show(img)
 
+@_coalesced
 def screen_menu(page: int = 0, data: dict = None):
     img, draw, font = _draw()
     data = data or {}
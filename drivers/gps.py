@@ -73,34 +73,52 @@ def init(nmea_port: str = "/dev/ttyUSB1", at_port: str = "/dev/ttyUSB2",
     return True
 
 
-def _at_send(port: str, baud: int, cmd: str, timeout: float = 1.0) -> str:
-    """Envoie une commande AT et retourne la réponse."""
-    with serial.Serial(port, baud, timeout=timeout) as s:
-        s.reset_input_buffer()
-        s.write((cmd + "\r").encode())
-        time.sleep(0.3)
-        return s.read(2048).decode(errors="ignore").strip()
+def _at_send(ser: serial.Serial, cmd: str, timeout: float = 1.0) -> str:
+    """
+    Envoie une commande AT sur un port déjà ouvert et retourne la réponse.
+    Rend la main dès la réponse finale (OK / ERROR), sans attente fixe.
+    """
+    ser.reset_input_buffer()
+    ser.write((cmd + "\r").encode())
+    buf = bytearray()
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        n = ser.in_waiting
+        if n:
+            buf += ser.read(n)
+            if b"\r\nOK\r\n" in buf or b"ERROR\r\n" in buf:
+                break
+        else:
+            time.sleep(0.005)
+    return buf.decode(errors="ignore").strip()
 
 
 def _at_init(port: str, baud: int):
     """Active le GNSS sur le SIM7600."""
-    resp = _at_send(port, baud, "AT")
-    if "OK" not in resp and "AT" not in resp:
-        print(f"[GPS] SIM7600 non détecté (AT → {resp!r})")
-        return
-    for cmd in ["AT+CGNSSMODE=1", "AT+CGPS=0", "AT+CGPS=1"]:
-        _at_send(port, baud, cmd)
-        time.sleep(0.3)
+    with serial.Serial(port, baud, timeout=1.0) as s:
+        resp = _at_send(s, "AT")
+        if "OK" not in resp and "AT" not in resp:
+            print(f"[GPS] SIM7600 non détecté (AT → {resp!r})")
+            return
+        for cmd in ["AT+CGNSSMODE=1", "AT+CGPS=0", "AT+CGPS=1"]:
+            _at_send(s, cmd)
     print("[GPS] GNSS activé via AT")
 
 
 def _update_network_info(port: str, baud: int):
     """Récupère RSSI + type réseau + opérateur via AT."""
+    with serial.Serial(port, baud, timeout=1.0) as s:
+        csq = _at_send(s, "AT+CSQ")
+        cops = _at_send(s, "AT+COPS?")
+    _parse_network_info(csq, cops)
+
+
+def _parse_network_info(csq_resp: str, cops_resp: str):
+    """Met à jour le cache réseau à partir des réponses +CSQ / +COPS."""
     global _data
 
     # RSSI : +CSQ: 18,99 → RSSI = -113 + 2*18 = -77 dBm
-    resp = _at_send(port, baud, "AT+CSQ")
-    for line in resp.split("\n"):
+    for line in csq_resp.split("\n"):
         if "+CSQ:" in line:
             try:
                 parts = line.split(":")[1].strip().split(",")
@@ -112,8 +130,7 @@ def _update_network_info(port: str, baud: int):
                 pass
 
     # Opérateur : +COPS: 0,0,"Orange F",7
-    resp = _at_send(port, baud, "AT+COPS?")
-    for line in resp.split("\n"):
+    for line in cops_resp.split("\n"):
         if "+COPS:" in line:
             try:
                 parts = line.split(",")
@@ -8,18 +8,38 @@ Couleurs prédéfinies :
   - orange    : orange (warning)
   - blue      : bleu (info)
   - offline   : bleu sombre
+
+Backends :
+  1. pigpio (démon pigpiod) : PWM cadencée par DMA, sans thread CPU ni
+     gigue ; un clignotement de couleur pure (canaux 0 ou 100 %) est
+     une waveform envoyée en boucle par le démon, sans thread Python.
+  2. RPi.GPIO : PWM logicielle, clignotement par thread.
 """
 from __future__ import annotations
 import threading
 import time
 
+try:
+    import pigpio  # type: ignore
+except ImportError:  # repli RPi.GPIO
+    pigpio = None
+
 _gpio = None
 _pwm_r = None
 _pwm_g = None
 _pwm_b = None
+_pi = None            # connexion pigpiod (backend 1)
+_pins = ()            # (R, G, B) pour pigpio
+_wave_id = None       # waveform de clignotement en cours (pigpio)
 _initialized = False
 _blink_thread = None
 _blink_stop = threading.Event()
+# Dernier rendu demandé : ("solid", nom) ou ("blink", nom, on_s, off_s).
+# Un appel identique au précédent ne touche ni la PWM ni le thread.
+_current = None
+
+PWM_FREQ = 1000
+PWM_RANGE = 1000      # pigpio : pas de 0.1 %
 
 # Couleurs prédéfinies (R, G, B) 0-255
 COLORS = {
@@ -37,10 +57,38 @@ COLORS = {
     "info":    (0, 80, 255),
 }
 
+# Mêmes couleurs en rapports cycliques PWM (0-100 %), calculés une fois
+_DUTY = {name: (r * 100 / 255, g * 100 / 255, b * 100 / 255)
+         for name, (r, g, b) in COLORS.items()}
+_DUTY_OFF = _DUTY["off"]
+
+
+def _init_pigpio(pins: tuple) -> bool:
+    """Backend pigpio. Retourne False si le démon est injoignable."""
+    global _pi, _pins, _initialized
+    if pigpio is None:
+        return False
+    pi = pigpio.pi()
+    if not pi.connected:
+        pi.stop()
+        return False
+    for p in pins:
+        pi.set_mode(p, pigpio.OUTPUT)
+        pi.set_PWM_frequency(p, PWM_FREQ)
+        pi.set_PWM_range(p, PWM_RANGE)
+        pi.set_PWM_dutycycle(p, 0)
+    _pi, _pins = pi, pins
+    _initialized = True
+    print(f"[LED] RGB initialisée (pigpio) sur GPIO R={pins[0]} G={pins[1]} B={pins[2]}")
+    return True
+
 
 def init(pin_r: int = 22, pin_g: int = 23, pin_b: int = 24) -> bool:
     global _gpio, _pwm_r, _pwm_g, _pwm_b, _initialized
     try:
+        if _init_pigpio((pin_r, pin_g, pin_b)):
+            return True
+
         import RPi.GPIO as GPIO
         _gpio = GPIO
         _gpio.setwarnings(False)
@@ -65,52 +113,113 @@ def init(pin_r: int = 22, pin_g: int = 23, pin_b: int = 24) -> bool:
         return False
 
 
-def set_color(r: int = 0, g: int = 0, b: int = 0):
-    """Fixe la couleur (0-255 par canal)."""
+def _set_duty(duty: tuple):
+    """Applique un triplet de rapports cycliques (%) aux 3 canaux."""
     if not _initialized:
         return
     try:
-        _pwm_r.ChangeDutyCycle(r * 100 / 255)
-        _pwm_g.ChangeDutyCycle(g * 100 / 255)
-        _pwm_b.ChangeDutyCycle(b * 100 / 255)
+        if _pi is not None:
+            for pin, d in zip(_pins, duty):
+                _pi.set_PWM_dutycycle(pin, int(d * PWM_RANGE / 100))
+            return
+        _pwm_r.ChangeDutyCycle(duty[0])
+        _pwm_g.ChangeDutyCycle(duty[1])
+        _pwm_b.ChangeDutyCycle(duty[2])
     except Exception:
         pass
 
 
+def set_color(r: int = 0, g: int = 0, b: int = 0):
+    """Fixe la couleur (0-255 par canal)."""
+    global _current
+    _current = None
+    _set_duty((r * 100 / 255, g * 100 / 255, b * 100 / 255))
+
+
 def set_named(name: str):
-    """Fixe une couleur prédéfinie."""
+    """Fixe une couleur prédéfinie (sans effet si déjà affichée)."""
+    global _current
+    if not _initialized or _current == ("solid", name):
+        return
     stop_blink()
-    r, g, b = COLORS.get(name, (0, 0, 0))
-    set_color(r, g, b)
+    _set_duty(_DUTY.get(name, _DUTY_OFF))
+    _current = ("solid", name)
 
 
 def off():
-    stop_blink()
-    set_color(0, 0, 0)
+    set_named("off")
 
 
 def blink(name: str = "red", on_s: float = 0.5, off_s: float = 0.5):
-    """Clignotement continu (non-bloquant)."""
+    """Clignotement continu (non-bloquant, sans effet si déjà en cours)."""
+    global _current
+    key = ("blink", name, on_s, off_s)
+    if not _initialized or _current == key:
+        return
     stop_blink()
+    _current = key
+    duty = _DUTY.get(name, _DUTY["red"])
+    if _pi is not None and all(d in (0, 100) for d in duty):
+        _start_wave(duty, on_s, off_s)
+        return
     _blink_stop.clear()
 
     def _loop():
-        r, g, b = COLORS.get(name, (255, 0, 0))
         while not _blink_stop.is_set():
-            set_color(r, g, b)
+            _set_duty(duty)
             if _blink_stop.wait(on_s):
                 break
-            set_color(0, 0, 0)
+            _set_duty(_DUTY_OFF)
             if _blink_stop.wait(off_s):
                 break
-        set_color(0, 0, 0)
+        _set_duty(_DUTY_OFF)
 
     global _blink_thread
     _blink_thread = threading.Thread(target=_loop, daemon=True)
     _blink_thread.start()
 
 
+def _start_wave(duty: tuple, on_s: float, off_s: float):
+    """Clignotement tout-ou-rien joué en boucle par pigpiod (DMA)."""
+    global _wave_id
+    try:
+        on_mask = 0
+        all_mask = 0
+        for pin, d in zip(_pins, duty):
+            _pi.set_PWM_dutycycle(pin, 0)  # la waveform reprend la pin
+            all_mask |= 1 << pin
+            if d:
+                on_mask |= 1 << pin
+        _pi.wave_add_new()
+        _pi.wave_add_generic([
+            pigpio.pulse(on_mask, all_mask & ~on_mask, int(on_s * 1e6)),
+            pigpio.pulse(0, all_mask, int(off_s * 1e6)),
+        ])
+        _wave_id = _pi.wave_create()
+        _pi.wave_send_repeat(_wave_id)
+    except Exception:
+        _wave_id = None
+
+
+def _stop_wave():
+    global _wave_id
+    if _wave_id is None:
+        return
+    try:
+        _pi.wave_tx_stop()
+        _pi.wave_delete(_wave_id)
+        for pin in _pins:
+            _pi.write(pin, 0)
+    except Exception:
+        pass
+    _wave_id = None
+
+
 def stop_blink():
+    global _current
+    if _current is not None and _current[0] == "blink":
+        _current = None  # LED éteinte par l'arrêt du clignotement
+    _stop_wave()
     _blink_stop.set()
     if _blink_thread and _blink_thread.is_alive():
         _blink_thread.join(timeout=2)
@@ -126,4 +235,9 @@ def cleanup():
                 pwm.stop()
             except Exception:
                 pass
+    if _pi is not None:
+        try:
+            _pi.stop()
+        except Exception:
+            pass
     _initialized = False
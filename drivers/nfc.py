@@ -3,23 +3,38 @@ Driver NFC PN532 — Authentification badge I2C.
 
 Capteur : PN532 sur I2C (adresse 0x24)
 Fonction : scan badges NFC/RFID, retourne UID + hash SHA-256.
+
+read_passive_target() bloque tout son timeout quand aucun badge n'est
+présent : en authentification, la lecture tourne dans un thread
+(start_reader) et la boucle principale ne fait que take().
 """
 from __future__ import annotations
+import functools
 import hashlib
+import threading
 
 _pn532 = None
 _initialized = False
 _firmware = ""
 
+# Lecture en tâche de fond
+READ_TIMEOUT_S = 0.1   # court : le thread voit vite stop_reader()
+_reader = None
+_reader_stop = threading.Event()
+_badge_lock = threading.Lock()
+_badge = None          # badge lu par le thread, consommé par take()
+_session = 0           # numéro de la session de lecture courante
+_active = False        # session ouverte (start_reader → take/stop_reader)
+
 
 def init() -> bool:
     global _pn532, _initialized, _firmware
     try:
         import board
-        import busio
         from adafruit_pn532.i2c import PN532_I2C
 
-        i2c = busio.I2C(board.SCL, board.SDA)
+        # Bus I2C partagé (singleton board.I2C, même verrou que l'OLED)
+        i2c = board.I2C()
         _pn532 = PN532_I2C(i2c, debug=False)
 
         ic, ver, rev, support = _pn532.firmware_version
@@ -34,6 +49,12 @@ def init() -> bool:
         return False
 
 
+@functools.lru_cache(maxsize=32)
+def _uid_hash(uid_bytes: bytes) -> str:
+    """SHA-256 hex d'un UID (mêmes badges relus → cache)."""
+    return hashlib.sha256(uid_bytes).hexdigest()
+
+
 def scan(timeout: float = 0.3) -> dict | None:
     """
     Scan un badge NFC. Non-bloquant (timeout court par défaut).
@@ -47,9 +68,9 @@ def scan(timeout: float = 0.3) -> dict | None:
         if uid is None:
             return None
 
-        uid_hex = ":".join(f"{b:02X}" for b in uid)
         uid_bytes = bytes(uid)
-        uid_hash = hashlib.sha256(uid_bytes).hexdigest()
+        uid_hex = uid_bytes.hex(":").upper()
+        uid_hash = _uid_hash(uid_bytes)
 
         return {
             "uid": uid_hex,
@@ -62,10 +83,72 @@ def scan(timeout: float = 0.3) -> dict | None:
         return None
 
 
+def _reader_loop(session: int):
+    """Thread : scanne jusqu'au premier badge (ou stop_reader)."""
+    global _badge, _active
+    while session == _session and not _reader_stop.is_set():
+        badge = scan(timeout=READ_TIMEOUT_S)
+        if not badge:
+            continue
+        # Revérifié sous verrou après scan() : un badge lu après
+        # stop_reader() (ou pour une session close) est jeté
+        with _badge_lock:
+            if session == _session and not _reader_stop.is_set():
+                _badge = badge
+        return  # un badge par session d'authentification
+
+
+def start_reader():
+    """Ouvre une session de lecture en tâche de fond (idempotent).
+
+    Une nouvelle session repart toujours sans badge : rien de lu pendant
+    une session précédente ne peut authentifier celle-ci.
+    """
+    global _reader, _badge, _session, _active
+    if not _initialized or _active:
+        return
+    if _reader is not None and _reader.is_alive():
+        # Session précédente : laisser finir son scan en cours (PN532
+        # non partageable entre deux threads)
+        _reader.join(timeout=READ_TIMEOUT_S + 1.0)
+    with _badge_lock:
+        _session += 1
+        _active = True
+        _badge = None
+        _reader_stop.clear()
+    _reader = threading.Thread(target=_reader_loop, args=(_session,),
+                               daemon=True, name="nfc")
+    _reader.start()
+
+
+def stop_reader():
+    """Ferme la session et oublie un badge non consommé (sans attendre)."""
+    global _badge, _active
+    with _badge_lock:
+        _reader_stop.set()
+        _active = False
+        _badge = None
+
+
+def take() -> dict | None:
+    """Badge lu par le thread depuis le dernier appel, sinon None.
+
+    Un badge rendu clôt la session : le prochain start_reader() en ouvre
+    une nouvelle.
+    """
+    global _badge, _active
+    with _badge_lock:
+        badge, _badge = _badge, None
+        if badge is not None:
+            _active = False
+    return badge
+
+
 def firmware_version() -> str:
     return _firmware
 
 
 def cleanup():
     global _initialized
+    stop_reader()
     _initialized = False
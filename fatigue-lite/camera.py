@@ -10,10 +10,15 @@ Réglages spéciaux pour IMX219 IR (sans filtre IR) :
   - Gains de couleur ajustables
   - Temps d'exposition limité pour éviter le flou
 """
+import time
 import cv2
 import numpy as np
 import config
 
+# Nb max de frames en file V4L2 jetées avant une lecture (si le backend
+# ignore CAP_PROP_BUFFERSIZE) — la frame rendue est toujours la plus récente
+MAX_DRAIN = 4
+
 # ─── Tentative d'import Picamera2 ───────────────────────────────────
 _PICAMERA2 = False
 try:
@@ -41,6 +46,8 @@ class Camera:
         self.crop_ratio = crop_ratio if crop_ratio is not None else config.CENTER_CROP_RATIO
         self._picam = None
         self._cv_cap = None
+        self._drain = 0  # frames à vider par read() (OpenCV live uniquement)
+        self._isp_crop = False  # crop + mise à l'échelle faits par l'ISP
 
         if isinstance(self.source, int) and _PICAMERA2:
             self._init_picamera2()
@@ -67,17 +74,44 @@ class Camera:
             print(f"[CAM] Mode IR activé : gains={config.IR_COLOUR_GAINS}, "
                   f"expo={config.IR_EXPOSURE_TIME}µs, gain={config.IR_ANALOGUE_GAIN}")
 
-        cam_config = self._picam.create_preview_configuration(
-            main={"format": "RGB888", "size": (self.cap_w, self.cap_h)},
-            controls=controls,
-        )
-        self._picam.configure(cam_config)
+        # Center-crop délégué à l'ISP (ScalerCrop) : la sortie "main" est
+        # directement l'image croppée, à la résolution que le pipeline
+        # recevait après le crop CPU → plus aucune passe CPU par frame.
+        # "BGR888" = ordre mémoire [R, G, B] : identique à l'ancien
+        # RGB888 + cvtColor, sans la conversion.
+        size = (self.cap_w, self.cap_h)
+        if 0.0 < self.crop_ratio < 1.0 and "ScalerCrop" in self._picam.camera_controls:
+            size = (int(self.cap_w * self.crop_ratio), int(self.cap_h * self.crop_ratio))
+        out_w, out_h = self._configure_main(size, controls)
+
+        if size != (self.cap_w, self.cap_h):
+            try:
+                x, y, w, h = self._picam.camera_controls["ScalerCrop"][2]
+                cw, ch = int(w * self.crop_ratio), int(h * self.crop_ratio)
+                self._picam.set_controls(
+                    {"ScalerCrop": (x + (w - cw) // 2, y + (h - ch) // 2, cw, ch)})
+                self._isp_crop = True
+            except Exception as e:
+                # Crop ISP indisponible → capture pleine taille + crop CPU
+                print(f"[CAM] ScalerCrop indisponible ({e}), crop CPU")
+                out_w, out_h = self._configure_main((self.cap_w, self.cap_h), controls)
+
         self._picam.start()
 
         # Laisser le capteur se stabiliser
-        import time
         time.sleep(1.0)
-        print(f"[CAM] Picamera2 démarrée : {self.cap_w}x{self.cap_h} @ {self.fps} fps")
+        mode = "crop ISP" if self._isp_crop else "crop CPU"
+        print(f"[CAM] Picamera2 démarrée : {out_w}x{out_h} @ {self.fps} fps ({mode})")
+
+    def _configure_main(self, size, controls):
+        """Configure le flux main (aligné sur les contraintes ISP) → taille réelle."""
+        cam_config = self._picam.create_preview_configuration(
+            main={"format": "BGR888", "size": size},
+            controls=controls,
+        )
+        self._picam.align_configuration(cam_config)
+        self._picam.configure(cam_config)
+        return cam_config["main"]["size"]
 
     # ── Initialisation OpenCV ────────────────────────────────────────
     def _init_opencv(self):
@@ -86,6 +120,10 @@ class Camera:
             self._cv_cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.cap_w)
             self._cv_cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.cap_h)
             self._cv_cap.set(cv2.CAP_PROP_FPS, self.fps)
+            # File de capture à 1 frame : pas de retard qui s'accumule.
+            # Backend qui refuse → on vide la file à la main dans read().
+            if not self._cv_cap.set(cv2.CAP_PROP_BUFFERSIZE, 1):
+                self._drain = MAX_DRAIN
         if not self._cv_cap.isOpened():
             raise RuntimeError(f"[CAM] Impossible d'ouvrir la source vidéo : {self.source}")
         actual_w = int(self._cv_cap.get(cv2.CAP_PROP_FRAME_WIDTH))
@@ -93,18 +131,25 @@ class Camera:
         print(f"[CAM] OpenCV capture : {actual_w}x{actual_h}")
 
     # ── Lecture d'une frame ──────────────────────────────────────────
-    def read(self):
+    def read(self, dst=None):
         """
         Retourne (ok, frame_bgr) avec le center-crop appliqué.
         frame_bgr est en BGR (convention OpenCV).
+
+        dst : buffer préalloué (même forme que la frame croppée) réutilisé
+        au lieu d'allouer une nouvelle image ; ignoré si la forme diffère.
         """
         frame = None
         if self._picam is not None:
-            frame = self._picam.capture_array()
-            # Picamera2 retourne RGB → convertir en BGR pour cohérence OpenCV
-            frame = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
+            # capture_array() rend déjà une copie neuve : dst inutile
+            frame = self._picam.capture_array("main")
+            if self._isp_crop:
+                return True, frame
         elif self._cv_cap is not None:
-            ok, frame = self._cv_cap.read()
+            if self._drain:
+                ok, frame = self._read_latest()
+            else:
+                ok, frame = self._cv_cap.read()
             if not ok or frame is None:
                 return False, None
         else:
@@ -112,20 +157,43 @@ class Camera:
 
         # Center-crop
         if 0.0 < self.crop_ratio < 1.0:
-            frame = self._center_crop(frame, self.crop_ratio)
+            frame = self._center_crop(frame, self.crop_ratio, dst)
+        elif dst is not None and dst.shape == frame.shape:
+            np.copyto(dst, frame)
+            frame = dst
 
         return True, frame
 
+    def _read_latest(self):
+        """grab() jusqu'à tomber sur une frame fraîche, puis retrieve().
+
+        Un grab() qui rend la main immédiatement vient d'une file pleine
+        (frame ancienne) ; un grab() qui attend ~une période capteur a
+        obtenu une frame neuve → on s'arrête là.
+        """
+        half_period = 0.5 / max(self.fps, 1)
+        for _ in range(self._drain):
+            t = time.perf_counter()
+            if not self._cv_cap.grab():
+                return False, None
+            if time.perf_counter() - t > half_period:
+                break
+        return self._cv_cap.retrieve()
+
     # ── Center-crop ──────────────────────────────────────────────────
     @staticmethod
-    def _center_crop(image, ratio):
-        """Garde `ratio` (0..1) de l'image au centre."""
+    def _center_crop(image, ratio, dst=None):
+        """Garde `ratio` (0..1) de l'image au centre (copie dans dst si fourni)."""
         h, w = image.shape[:2]
         new_w = int(w * ratio)
         new_h = int(h * ratio)
         x1 = (w - new_w) // 2
         y1 = (h - new_h) // 2
-        return image[y1 : y1 + new_h, x1 : x1 + new_w].copy()
+        crop = image[y1 : y1 + new_h, x1 : x1 + new_w]
+        if dst is not None and dst.shape == crop.shape:
+            np.copyto(dst, crop)
+            return dst
+        return crop.copy()
 
     # ── Nettoyage ────────────────────────────────────────────────────
     def release(self):
@@ -42,6 +42,9 @@ FACE_SCORE_THRESHOLD = 0.35 if _IS_PI else 0.50   # IR = scores plus bas
 FACE_IOU_THRESHOLD   = 0.3
 FACE_MIN_SIZE        = 20 if _IS_PI else 25        # visage plus petit à 70cm + crop
 NUM_THREADS          = 4
+DETECT_EVERY_N       = 2 if _IS_PI else 1          # détection 1 frame sur N, boîte extrapolée entre
+NO_FACE_IDLE_SEC     = 2.0                         # sans visage depuis X s → mode veille
+NO_FACE_DETECT_EVERY = 3                           # veille : 1 frame sur N traitée
 
 # ─── Head Nod (hochement de tête / microsommeil) ────────────────────
 NOD_SMOOTH_ALPHA   = 0.35       # Lissage EMA position Y (0=lent, 1=brut)
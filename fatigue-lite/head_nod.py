@@ -13,8 +13,9 @@ Deux types d'événements :
 Coût d'inférence : ZÉRO (utilise uniquement le bbox déjà détecté).
 """
 import time
-import numpy as np
+from collections import deque
 import config
+from p2_quantile import P2Quantile
 
 
 class HeadNodDetector:
@@ -31,10 +32,11 @@ class HeadNodDetector:
         self.state = self.IDLE
         self.down_since = None       # timestamp début descente
         self.cooldown_until = 0.0
-        self.nod_events = []         # timestamps des nods confirmés
+        self.nod_events = deque()    # timestamps des nods confirmés (croissants)
         self.is_microsleep = False   # tête basse > seuil continu
         self._face_h_avg = 0.15     # hauteur visage moyenne (ratio)
-        self._calib_samples = []
+        self._calib_y = P2Quantile(0.5)    # médianes en flux (mémoire O(1))
+        self._calib_h = P2Quantile(0.5)
         self._no_face_count = 0
 
     # ── Calibration ──────────────────────────────────────────────────
@@ -45,16 +47,15 @@ class HeadNodDetector:
             return
         cy = (face_box[1] + face_box[3]) / 2.0 / frame_h
         fh = (face_box[3] - face_box[1]) / frame_h
-        self._calib_samples.append((cy, fh))
+        self._calib_y.add(cy)
+        self._calib_h.add(fh)
 
     def finalize_baseline(self):
         """Calcule la baseline à partir des échantillons de calibration."""
-        n = len(self._calib_samples)
+        n = self._calib_y.count
         if n >= config.CALIBRATION_MIN_SAMPLES:
-            ys = [s[0] for s in self._calib_samples]
-            fhs = [s[1] for s in self._calib_samples]
-            self.baseline_y = float(np.median(ys))
-            self._face_h_avg = float(np.median(fhs))
+            self.baseline_y = float(self._calib_y.value())
+            self._face_h_avg = float(self._calib_h.value())
             print(f"[NOD] Baseline Y = {self.baseline_y:.3f}, "
                   f"face_h = {self._face_h_avg:.3f} ({n} échantillons)")
             return True
@@ -136,9 +137,11 @@ class HeadNodDetector:
             if now >= self.cooldown_until:
                 self.state = self.IDLE
 
-        # Nettoyer les vieux événements hors fenêtre
+        # Nettoyer les vieux événements hors fenêtre (les plus anciens en tête)
         cutoff = now - config.NOD_WINDOW_SEC
-        self.nod_events = [t for t in self.nod_events if t > cutoff]
+        events = self.nod_events
+        while events and events[0] <= cutoff:
+            events.popleft()
 
     # ── Propriétés ───────────────────────────────────────────────────
 
@@ -59,6 +59,43 @@ LEVEL_COLORS = {
     FatigueFusion.LEVEL_ALERT:   RED,
 }
 
+# Largeur des libellés de niveau (3 valeurs possibles → mesurées une fois)
+_LABEL_WIDTHS = {}
+
+# Bandeau statut pré-rendu (libellés fixes), un par largeur de frame
+_FONT = cv2.FONT_HERSHEY_SIMPLEX
+_BANNERS = {}
+
+
+def _text_w(txt, scale):
+    return cv2.getTextSize(txt, _FONT, scale, 1)[0][0]
+
+
+def _banner(w):
+    """
+    Retourne (image bandeau, abscisses des valeurs) pour une largeur `w`.
+    Les libellés "FPS:", "Nods:", "Baill:", "Head:" ne sont rendus qu'une
+    fois ; à chaque frame seules les valeurs numériques sont dessinées.
+    """
+    cached = _BANNERS.get(w)
+    if cached is None:
+        img = np.zeros((59, w, 3), dtype=np.uint8)
+        cv2.putText(img, "FPS:", (8, 18), _FONT, 0.5, WHITE, 1)
+        x_fps = 8 + _text_w("FPS:", 0.5)
+
+        cv2.putText(img, "Nods:", (8, 40), _FONT, 0.42, CYAN, 1)
+        x_nods = 8 + _text_w("Nods:", 0.42)
+        x = x_nods + _text_w("99/5min  ", 0.42)
+        cv2.putText(img, "Baill:", (x, 40), _FONT, 0.42, CYAN, 1)
+        x_baill = x + _text_w("Baill:", 0.42)
+        x = x_baill + _text_w("99  ", 0.42)
+        cv2.putText(img, "Head:", (x, 40), _FONT, 0.42, CYAN, 1)
+        x_head = x + _text_w("Head:", 0.42)
+
+        cached = (img, (x_fps, x_nods, x_baill, x_head))
+        _BANNERS[w] = cached
+    return cached
+
 
 # ─── Overlay ─────────────────────────────────────────────────────────
 def draw_overlay(frame, face_box, nod, yawn, fusion, fps):
@@ -67,23 +104,26 @@ def draw_overlay(frame, face_box, nod, yawn, fusion, fps):
     color = LEVEL_COLORS.get(fusion.level, GREEN)
 
     # ── Bandeau statut en haut ───────────────────────────────────────
-    cv2.rectangle(frame, (0, 0), (w, 58), (0, 0, 0), -1)
+    # Copie du fond pré-rendu (libellés inclus) plutôt que rectangle + texte
+    banner, (x_fps, x_nods, x_baill, x_head) = _banner(w)
+    frame[:59] = banner
 
     # Ligne 1 : FPS + niveau
-    cv2.putText(frame, f"FPS:{fps:.1f}", (8, 18),
-                cv2.FONT_HERSHEY_SIMPLEX, 0.5, WHITE, 1)
+    cv2.putText(frame, f"{fps:.1f}", (x_fps, 18), _FONT, 0.5, WHITE, 1)
     label = f"[{fusion.level_name}]"
-    lw = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.6, 2)[0][0]
+    lw = _LABEL_WIDTHS.get(label)
+    if lw is None:
+        lw = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.6, 2)[0][0]
+        _LABEL_WIDTHS[label] = lw
     cv2.putText(frame, label, (w - lw - 8, 20),
                 cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
 
-    # Ligne 2 : nods + yawns + head
-    nod_txt = f"Nods:{nod.nod_count}/{config.NOD_WINDOW_SEC/60:.0f}min"
-    yawn_txt = f"Baill:{yawn.yawn_count}"
-    dev_txt = f"Head:{nod.deviation:+.2f} [{nod.state_name}]"
-    info = f"{nod_txt}  {yawn_txt}  {dev_txt}"
-    cv2.putText(frame, info, (8, 40),
-                cv2.FONT_HERSHEY_SIMPLEX, 0.42, CYAN, 1)
+    # Ligne 2 : nods + yawns + head (valeurs seules, libellés dans le fond)
+    cv2.putText(frame, f"{nod.nod_count}/{config.NOD_WINDOW_SEC/60:.0f}min",
+                (x_nods, 40), _FONT, 0.42, CYAN, 1)
+    cv2.putText(frame, str(yawn.yawn_count), (x_baill, 40), _FONT, 0.42, CYAN, 1)
+    cv2.putText(frame, f"{nod.deviation:+.2f} [{nod.state_name}]",
+                (x_head, 40), _FONT, 0.42, CYAN, 1)
 
     # Ligne 3 : durée tête basse (si > 0)
     if nod.head_down_duration > 0.1:
@@ -120,17 +160,13 @@ def draw_overlay(frame, face_box, nod, yawn, fusion, fps):
 
         # Indicateur bouche
         if config.DRAW_MOUTH_ROI:
-            fw, fh = x2 - x1, y2 - y1
-            mx1 = int(x1 + config.MOUTH_ROI_X1 * fw)
-            my1 = int(y1 + config.MOUTH_ROI_Y1 * fh)
-            mx2 = int(x1 + config.MOUTH_ROI_X2 * fw)
-            my2 = int(y1 + config.MOUTH_ROI_Y2 * fh)
+            mx1, my1, mx2, my2 = YawnDetector.mouth_box(x1, y1, x2 - x1, y2 - y1)
             mc = ORANGE if yawn.is_yawning else GREEN
             cv2.rectangle(frame, (mx1, my1), (mx2, my2), mc, 1)
 
     # ── Alerte full-screen ───────────────────────────────────────────
     if fusion.level == FatigueFusion.LEVEL_ALERT:
-        cv2.rectangle(frame, (0, h - 30), (w, h), RED, -1)
+        frame[h - 30:] = RED
         cv2.putText(frame, "!!! ALERTE FATIGUE !!!", (w // 2 - 120, h - 8),
                     cv2.FONT_HERSHEY_SIMPLEX, 0.6, WHITE, 2)
 
@@ -174,6 +210,10 @@ def run(args):
     print("  Fatigue Lite — Head Nod + Bâillements")
     pi_str = "Pi Zero 2 W + IMX219 IR" if config._IS_PI else "PC"
     print(f"  Plateforme : {pi_str}")
+    if config._IS_PI:
+        cv2.setUseOptimized(True)
+        neon = cv2.checkHardwareSupport(cv2.CPU_NEON)
+        print(f"  OpenCV {cv2.__version__} — NEON : {'oui' if neon else 'NON (build scalaire)'}")
     print("=" * 60)
 
     # Init
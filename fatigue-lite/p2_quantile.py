@@ -0,0 +1,83 @@
+"""
+Estimateur de quantile en ligne — algorithme P² (Jain & Chlamtac, 1985).
+
+Remplace l'accumulation d'échantillons dans une liste suivie d'un
+np.median() final : mémoire constante (5 marqueurs), O(1) par échantillon.
+
+Jusqu'à 5 échantillons la valeur est exacte (même interpolation que
+np.quantile) ; au-delà c'est une approximation, largement suffisante
+pour des baselines de calibration.
+"""
+
+
+class P2Quantile:
+    """Quantile `p` (0..1) d'un flux de valeurs, sans les stocker."""
+
+    def __init__(self, p=0.5):
+        self.p = p
+        self.count = 0
+        self._q = []                                   # hauteurs des marqueurs
+        self._n = [0, 1, 2, 3, 4]                      # positions réelles
+        self._np = [0.0, 2 * p, 4 * p, 2 + 2 * p, 4.0]  # positions désirées
+        self._dn = (0.0, p / 2, p, (1 + p) / 2, 1.0)
+
+    def add(self, x):
+        """Ajoute un échantillon."""
+        self.count += 1
+        q = self._q
+
+        # ── Phase d'amorçage : 5 premiers échantillons triés ────────
+        if self.count <= 5:
+            q.append(x)
+            q.sort()
+            return
+
+        # ── Cellule k contenant x (étend les extrêmes si besoin) ────
+        n = self._n
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= q[k + 1]:
+                k += 1
+
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self._np[i] += self._dn[i]
+
+        # ── Ajustement des marqueurs centraux ────────────────────────
+        for i in (1, 2, 3):
+            d = self._np[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                qp = self._parabolic(i, d)
+                if q[i - 1] < qp < q[i + 1]:
+                    q[i] = qp
+                else:
+                    q[i] = q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+                n[i] += d
+
+    def _parabolic(self, i, d):
+        q, n = self._q, self._n
+        return q[i] + d / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    def value(self):
+        """Estimation courante du quantile (None si aucun échantillon)."""
+        if self.count == 0:
+            return None
+        if self.count <= 5:
+            # Exact : interpolation linéaire (convention np.quantile)
+            pos = self.p * (self.count - 1)
+            lo = int(pos)
+            hi = min(lo + 1, self.count - 1)
+            frac = pos - lo
+            return self._q[lo] + (self._q[hi] - self._q[lo]) * frac
+        return self._q[2]
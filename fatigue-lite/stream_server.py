@@ -4,30 +4,145 @@ stream_server.py — Serveur MJPEG léger pour visualisation distante.
 Lance un serveur HTTP qui diffuse les frames annotées en MJPEG.
 Accessible depuis un navigateur :  http://<ip-du-pi>:8080
 
-Aucune dépendance externe (stdlib Python uniquement).
-Thread séparé pour ne pas bloquer le pipeline principal.
+Aucune dépendance obligatoire en plus d'OpenCV. Si `simplejpeg`
+(libjpeg-turbo, SIMD NEON) est installé, il remplace cv2.imencode.
+Threads séparés (serveur HTTP + encodeur JPEG) pour ne pas bloquer le
+pipeline principal.
 """
 import threading
 import time
 from http.server import HTTPServer, BaseHTTPRequestHandler
 import cv2
 
-# Frame partagée entre le pipeline et le serveur
-_lock = threading.Lock()
-_current_frame = None  # JPEG bytes
+# ─── Tentative d'import simplejpeg ──────────────────────────────────
+_SIMPLEJPEG = False
+try:
+    import simplejpeg  # type: ignore
+    _SIMPLEJPEG = True
+except ImportError:
+    pass
+
+# Frame partagée entre le pipeline et le serveur : simple référence
+# (affectation atomique sous le GIL, jamais modifiée une fois publiée)
+# + Event « nouvelle frame » pour réveiller le lecteur sans polling.
+_current_frame = None  # JPEG (bytes ou ndarray uint8, tout objet buffer)
+_new_frame = threading.Event()
+_viewers_lock = threading.Lock()
 _running = False
+_viewers = 0           # clients /stream connectés
+_last_encode_ts = 0.0  # time.monotonic() de la dernière frame soumise
+_STREAM_PERIOD = 0.1   # ~10 FPS max, cadence d'envoi de _stream()
 
+# Slot d'entrée de l'encodeur (1 place, la dernière frame gagne)
+_raw_slot = [None, 80, None]  # [frame BGR, qualité, taille max (w, h)]
+_raw_event = threading.Event()
+_encoder_thread = None
 
-def update_frame(bgr_frame, quality=80):
-    """Appelé par le pipeline pour mettre à jour la frame diffusée."""
-    global _current_frame
-    if bgr_frame is None:
-        return
+# Qualité JPEG adaptative : baisse si l'encodeur sature, remonte au repos
+_QUALITY_MIN = 25
+_QUALITY_STEP = 5
+_ADAPT_EVERY = 20          # frames entre deux ajustements
+_ENCODE_SLOW_MS = 80.0     # EMA au-dessus → qualité -5
+_ENCODE_FAST_MS = 40.0     # EMA en dessous → qualité +5 (plafond = demandée)
+_quality = None            # qualité effective (lecture seule pour l'extérieur)
+_encode_ema_ms = 0.0
+
+
+def _encode_jpeg(bgr_frame, quality):
+    """Encode une frame BGR en JPEG.
+
+    Retourne un objet supportant le protocole buffer (bytes pour
+    simplejpeg, ndarray pour OpenCV — pas de recopie .tobytes()),
+    ou None en cas d'échec.
+    """
+    if _SIMPLEJPEG:
+        try:
+            return simplejpeg.encode_jpeg(bgr_frame, quality=quality,
+                                          colorspace="BGR", fastdct=True)
+        except ValueError:
+            pass  # ex. frame non contiguë → encodeur OpenCV
     ret, jpeg = cv2.imencode(".jpg", bgr_frame,
                              [cv2.IMWRITE_JPEG_QUALITY, quality])
-    if ret:
-        with _lock:
-            _current_frame = jpeg.tobytes()
+    return jpeg if ret else None
+
+
+def update_frame(bgr_frame, quality=80, stream_size=(320, 240)):
+    """Appelé par le pipeline pour mettre à jour la frame diffusée.
+
+    Ne fait que déposer la frame pour le thread encodeur (pas d'attente
+    JPEG dans le pipeline). L'appelant ne doit plus modifier la frame.
+    `stream_size` : boîte (w, h) dans laquelle la frame est réduite avant
+    encodage (ratio conservé, None = pleine résolution).
+    """
+    global _last_encode_ts
+    # Personne ne regarde → pas d'encodage JPEG (cas courant en prod)
+    if _viewers == 0 or bgr_frame is None:
+        return
+    # Inutile d'encoder plus vite que le flux n'envoie
+    now = time.monotonic()
+    if now - _last_encode_ts < _STREAM_PERIOD:
+        return
+    _last_encode_ts = now
+    _raw_slot[:] = (bgr_frame, quality, stream_size)
+    _raw_event.set()
+
+
+def _adapt_quality(requested):
+    """Ajuste _quality selon l'EMA du temps d'encodage, bornée à la demande."""
+    global _quality
+    if _quality is None or _quality > requested:
+        _quality = requested
+    elif _encode_ema_ms > _ENCODE_SLOW_MS:
+        _quality = max(min(_QUALITY_MIN, requested), _quality - _QUALITY_STEP)
+    elif _encode_ema_ms < _ENCODE_FAST_MS:
+        _quality = min(requested, _quality + _QUALITY_STEP)
+
+
+def _encoder_loop():
+    """Thread encodeur : prend la dernière frame déposée et publie le JPEG."""
+    global _current_frame, _encode_ema_ms
+    n_frames = 0
+    while _running:
+        if not _raw_event.wait(0.5):
+            continue
+        _raw_event.clear()
+        frame, quality, stream_size = _raw_slot
+        _raw_slot[0] = None
+        if frame is None:
+            continue
+        if stream_size is not None:
+            # Le navigateur réduit de toute façon : moins de pixels à encoder
+            h, w = frame.shape[:2]
+            scale = min(stream_size[0] / w, stream_size[1] / h)
+            if scale < 1.0:
+                frame = cv2.resize(frame, None, fx=scale, fy=scale,
+                                   interpolation=cv2.INTER_AREA)
+        if n_frames % _ADAPT_EVERY == 0:
+            _adapt_quality(quality)
+        n_frames += 1
+        t0 = time.perf_counter()
+        jpeg = _encode_jpeg(frame, _quality)
+        dt_ms = (time.perf_counter() - t0) * 1000.0
+        _encode_ema_ms = 0.9 * _encode_ema_ms + 0.1 * dt_ms
+        if jpeg is not None:
+            _current_frame = jpeg
+            _new_frame.set()
+
+
+def _sendmsg_all(sock, parts):
+    """Envoie `parts` en scatter-gather (sendmsg), reprend si envoi partiel."""
+    views = [memoryview(p).cast("B") for p in parts]
+    while views:
+        sent = sock.sendmsg(views)
+        while views and sent >= views[0].nbytes:
+            sent -= views[0].nbytes
+            views.pop(0)
+        if sent:
+            views[0] = views[0][sent:]
+
+
+_CRLF = b"\r\n"
+_PART_HEADER = b"--frame\r\nContent-Type: image/jpeg\r\nContent-Length: %d\r\n\r\n"
 
 
 class _MJPEGHandler(BaseHTTPRequestHandler):
@@ -56,27 +171,35 @@ class _MJPEGHandler(BaseHTTPRequestHandler):
 
     def _stream(self):
         """Flux MJPEG continu."""
+        global _viewers, _current_frame
         self.send_response(200)
         self.send_header("Content-Type",
                          "multipart/x-mixed-replace; boundary=frame")
         self.end_headers()
+        with _viewers_lock:
+            _viewers += 1
+        last_sent = None
         try:
             while _running:
-                with _lock:
-                    frame_data = _current_frame
-                if frame_data is None:
-                    time.sleep(0.1)
+                if not _new_frame.wait(_STREAM_PERIOD):
                     continue
-                self.wfile.write(b"--frame\r\n")
-                self.wfile.write(b"Content-Type: image/jpeg\r\n")
-                self.wfile.write(f"Content-Length: {len(frame_data)}\r\n".encode())
-                self.wfile.write(b"\r\n")
-                self.wfile.write(frame_data)
-                self.wfile.write(b"\r\n")
-                # ~10 FPS max pour le stream (économise bande passante)
-                time.sleep(0.1)
+                _new_frame.clear()
+                frame_data = _current_frame
+                if frame_data is None or frame_data is last_sent:
+                    continue
+                last_sent = frame_data  # ~10 FPS : borné par update_frame
+                # Vue sans copie sur le buffer publié (immuable une fois publié)
+                frame_view = memoryview(frame_data).cast("B")
+                # En-tête + JPEG + CRLF en un seul appel système
+                _sendmsg_all(self.request,
+                             (_PART_HEADER % frame_view.nbytes, frame_view, _CRLF))
         except (BrokenPipeError, ConnectionResetError):
             pass
+        finally:
+            with _viewers_lock:
+                _viewers -= 1
+                if _viewers == 0:
+                    _current_frame = None  # pas de frame périmée au prochain client
 
     def log_message(self, format, *args):
         """Supprimer les logs HTTP pour ne pas polluer la console."""
@@ -85,11 +208,14 @@ class _MJPEGHandler(BaseHTTPRequestHandler):
 
 def start(port=8080):
     """Démarre le serveur MJPEG en arrière-plan."""
-    global _running
+    global _running, _encoder_thread
     _running = True
     server = HTTPServer(("0.0.0.0", port), _MJPEGHandler)
     thread = threading.Thread(target=server.serve_forever, daemon=True)
     thread.start()
+    _encoder_thread = threading.Thread(target=_encoder_loop, daemon=True,
+                                       name="mjpeg-encoder")
+    _encoder_thread.start()
     print(f"[STREAM] Serveur MJPEG démarré → http://0.0.0.0:{port}")
     return server
 
@@ -98,5 +224,8 @@ def stop(server):
     """Arrête le serveur."""
     global _running
     _running = False
+    _raw_event.set()  # réveille l'encodeur pour qu'il sorte
+    if _encoder_thread is not None:
+        _encoder_thread.join(timeout=1.0)
     if server:
         server.shutdown()
@@ -16,6 +16,12 @@ import time
 import cv2
 import numpy as np
 import config
+from p2_quantile import P2Quantile
+
+
+# Coefficients ROI bouche (fractions du bbox visage), lus une fois au chargement
+_MOUTH_ROI = (config.MOUTH_ROI_X1, config.MOUTH_ROI_Y1,
+              config.MOUTH_ROI_X2, config.MOUTH_ROI_Y2)
 
 
 class YawnDetector:
@@ -30,19 +36,28 @@ class YawnDetector:
         self.is_yawning = False
 
         # Baseline bouche fermée (calibrée au démarrage)
-        self._baseline_samples = []
+        self._baseline_est = P2Quantile(0.5)   # médiane en flux
         self._baseline_mean = None
         self._effective_threshold = None  # ratio d'assombrissement
 
     # ── Extraction ROI bouche ────────────────────────────────────────
     @staticmethod
-    def extract_mouth_roi(image, face_box):
+    def mouth_box(x1, y1, fw, fh):
+        """Coins (mx1, my1, mx2, my2) du ROI bouche, non clippés."""
+        rx1, ry1, rx2, ry2 = _MOUTH_ROI
+        return (int(x1 + rx1 * fw), int(y1 + ry1 * fh),
+                int(x1 + rx2 * fw), int(y1 + ry2 * fh))
+
+    @staticmethod
+    def extract_mouth_roi(image, face_box, out=None):
         """
         Extrait la zone de la bouche dans le bbox visage.
 
         Args:
             image   : image BGR complète
             face_box: [x1, y1, x2, y2, score]
+            out     : buffer réutilisé si sa forme correspond au ROI
+                      (sinon un nouveau crop est alloué)
 
         Returns:
             crop BGR de la bouche, ou None
@@ -55,36 +70,45 @@ class YawnDetector:
 
         img_h, img_w = image.shape[:2]
 
-        mx1 = max(int(x1 + config.MOUTH_ROI_X1 * fw), 0)
-        my1 = max(int(y1 + config.MOUTH_ROI_Y1 * fh), 0)
-        mx2 = min(int(x1 + config.MOUTH_ROI_X2 * fw), img_w)
-        my2 = min(int(y1 + config.MOUTH_ROI_Y2 * fh), img_h)
+        mx1, my1, mx2, my2 = YawnDetector.mouth_box(x1, y1, fw, fh)
+        mx1, my1 = max(mx1, 0), max(my1, 0)
+        mx2, my2 = min(mx2, img_w), min(my2, img_h)
 
         if mx2 <= mx1 or my2 <= my1:
             return None
 
-        return image[my1:my2, mx1:mx2].copy()
+        roi = image[my1:my2, mx1:mx2]
+        if out is not None and out.shape == roi.shape:
+            np.copyto(out, roi)
+            return out
+        return roi.copy()
 
     # ── Mesure d'intensité ───────────────────────────────────────────
     @staticmethod
     def _mean_intensity(mouth_bgr):
-        """Intensité moyenne en niveaux de gris."""
+        """Intensité moyenne en niveaux de gris.
+
+        Le gris étant linéaire (0.299 R + 0.587 G + 0.114 B), sa moyenne
+        est la même combinaison des moyennes par canal : une seule
+        réduction cv2.mean, sans image grise intermédiaire.
+        """
         if mouth_bgr is None or mouth_bgr.size == 0:
             return -1.0
-        gray = cv2.cvtColor(mouth_bgr, cv2.COLOR_BGR2GRAY)
-        return float(np.mean(gray))
+        b, g, r, _ = cv2.mean(mouth_bgr)
+        return 0.114 * b + 0.587 * g + 0.299 * r
 
     # ── Calibration baseline ─────────────────────────────────────────
     def update_baseline(self, mouth_bgr):
         """Accumule les intensités bouche fermée pendant la calibration."""
         val = self._mean_intensity(mouth_bgr)
         if val > 0:
-            self._baseline_samples.append(val)
+            self._baseline_est.add(val)
 
     def finalize_baseline(self):
         """Fixe la baseline et le seuil d'ouverture."""
-        if len(self._baseline_samples) > 5:
-            self._baseline_mean = float(np.median(self._baseline_samples))
+        n = self._baseline_est.count
+        if n > 5:
+            self._baseline_mean = float(self._baseline_est.value())
             # Bouche ouverte = intensité chute de MOUTH_DROP_RATIO par rapport
             # à la baseline. Ex: baseline=120, ratio=0.30 → seuil à 84.
             self._effective_threshold = self._baseline_mean * (1.0 - config.MOUTH_DROP_RATIO)
@@ -94,9 +118,9 @@ class YawnDetector:
         else:
             self._baseline_mean = None
             self._effective_threshold = None
-            print(f"[YAWN] Pas assez d'échantillons ({len(self._baseline_samples)}), "
+            print(f"[YAWN] Pas assez d'échantillons ({n}), "
                   f"bâillements désactivés")
-        self._baseline_samples = []  # libérer mémoire
+        self._baseline_est = P2Quantile(0.5)  # prêt pour une recalibration
 
     # ── Mise à jour par frame ────────────────────────────────────────
     def update(self, mouth_bgr, timestamp=None):
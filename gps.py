@@ -1,42 +1,71 @@
 #!/usr/bin/env python3
 import time
 import serial
-import pynmea2
 
 AT_PORT = "/dev/ttyUSB2"
 NMEA_PORT = "/dev/ttyUSB1"
 BAUD = 115200
 
-def at_send(cmd, timeout=1.0, wait=0.25):
-    with serial.Serial(AT_PORT, BAUD, timeout=timeout) as s:
-        s.reset_input_buffer()
-        s.write((cmd + "\r").encode())
-        time.sleep(wait)
-        return s.read(2048).decode(errors="ignore").strip()
+def at_send(cmd, ser=None, timeout=1.0):
+    """
+    Envoie une commande AT et retourne la réponse.
+    `ser` : port déjà ouvert (réutilisé) ; sinon ouverture/fermeture ponctuelle.
+    Rend la main dès la réponse finale (OK / ERROR), sans attente fixe.
+    """
+    if ser is None:
+        with serial.Serial(AT_PORT, BAUD, timeout=timeout) as s:
+            return at_send(cmd, s, timeout)
+    ser.reset_input_buffer()
+    ser.write((cmd + "\r").encode())
+    buf = bytearray()
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        n = ser.in_waiting
+        if n:
+            buf += ser.read(n)
+            if b"\r\nOK\r\n" in buf or b"ERROR\r\n" in buf:
+                break
+        else:
+            time.sleep(0.005)
+    return buf.decode(errors="ignore").strip()
 
 def try_gnss_init():
     print("AT init...")
-    for cmd in [
-        "AT",
-        "AT+CGNSSMODE=1",     # ok chez toi
-        "AT+CGPS?",           # juste pour info
-        "AT+CGPS=0",          # reset soft (optionnel)
-        "AT+CGPS=1",          # peut faire ERROR selon firmware
-        "AT+CGPS?",           # re-check
-    ]:
-        resp = at_send(cmd)
-        print(f"{cmd} => {resp or '(no reply)'}")
+    with serial.Serial(AT_PORT, BAUD, timeout=1.0) as s:
+        for cmd in [
+            "AT",
+            "AT+CGNSSMODE=1",     # ok chez toi
+            "AT+CGPS?",           # juste pour info
+            "AT+CGPS=0",          # reset soft (optionnel)
+            "AT+CGPS=1",          # peut faire ERROR selon firmware
+            "AT+CGPS?",           # re-check
+        ]:
+            resp = at_send(cmd, s)
+            print(f"{cmd} => {resp or '(no reply)'}")
 
 def ddmm_to_deg(v, hemi):
     if not v:
         return None
-    # lat: ddmm.mmmm / lon: dddmm.mmmm
-    if hemi in ("N", "S"):
-        d = int(v[:2]); m = float(v[2:])
-    else:
-        d = int(v[:3]); m = float(v[3:])
+    # lat: ddmm.mmmm / lon: dddmm.mmmm → divmod par 100 couvre les deux
+    d, m = divmod(float(v), 100)
     deg = d + m / 60.0
-    return -deg if hemi in ("S", "W") else deg
+    return -deg if hemi in (b"S", b"W") else deg
+
+def split_nmea(line):
+    """
+    Découpe une trame NMEA (bytes, sans CRLF) en champs bytes.
+    Vérifie le checksum s'il est présent ; retourne None s'il est faux.
+    """
+    star = line.rfind(b"*")
+    if star < 0:
+        return line[1:].split(b",")
+    body = line[1:star]
+    cs = 0
+    for b in body:
+        cs ^= b
+    if cs != int(line[star + 1:star + 3], 16):
+        return None
+    return body.split(b",")
 
 def main():
     try_gnss_init()
@@ -44,39 +73,42 @@ def main():
     print(f"\nListening NMEA on {NMEA_PORT} @ {BAUD} (Ctrl+C pour quitter)")
     with serial.Serial(NMEA_PORT, BAUD, timeout=1) as ser:
         while True:
-            line = ser.readline().decode(errors="ignore").strip()
-            if not line.startswith("$"):
+            line = ser.readline().strip()
+            if not line.startswith(b"$"):
                 continue
 
-            # parse NMEA
+            # parse NMEA (parser minimal : seules GGA et RMC sont exploitées)
             try:
-                msg = pynmea2.parse(line)
-            except pynmea2.ParseError:
-                continue
+                f = split_nmea(line)
+                if f is None:
+                    continue
+                kind = f[0][2:]  # "GPGGA" → "GGA" (talker ignoré)
 
-            # GGA = fix + sats + altitude
-            if isinstance(msg, pynmea2.types.talker.GGA):
-                q = int(msg.gps_qual or 0)
-                sats = int(msg.num_sats or 0) if msg.num_sats else 0
-                lat = ddmm_to_deg(msg.lat, msg.lat_dir)
-                lon = ddmm_to_deg(msg.lon, msg.lon_dir)
-                alt = float(msg.altitude) if msg.altitude else None
+                # GGA = fix + sats + altitude
+                if kind == b"GGA":
+                    q = int(f[6] or 0)
+                    sats = int(f[7] or 0)
+                    lat = ddmm_to_deg(f[2], f[3])
+                    lon = ddmm_to_deg(f[4], f[5])
+                    alt = float(f[9]) if f[9] else None
 
-                if q > 0:
-                    print(f"GGA: FIX q={q} sats={sats:02d} lat={lat} lon={lon} alt={alt}")
-                else:
-                    print(f"GGA: NOFIX sats={sats:02d}")
+                    if q > 0:
+                        print(f"GGA: FIX q={q} sats={sats:02d} lat={lat} lon={lon} alt={alt}")
+                    else:
+                        print(f"GGA: NOFIX sats={sats:02d}")
 
-            # RMC = date/heure + validité + vitesse
-            elif isinstance(msg, pynmea2.types.talker.RMC):
-                status = msg.status  # 'A' valid, 'V' void
-                lat = ddmm_to_deg(msg.lat, msg.lat_dir)
-                lon = ddmm_to_deg(msg.lon, msg.lon_dir)
-                spd_kn = float(msg.spd_over_grnd) if msg.spd_over_grnd else 0.0
-                if status == "A":
-                    print(f"RMC: FIX lat={lat} lon={lon} speed={spd_kn}kn")
-                else:
-                    print("RMC: NOFIX")
+                # RMC = date/heure + validité + vitesse
+                elif kind == b"RMC":
+                    status = f[2]  # 'A' valid, 'V' void
+                    lat = ddmm_to_deg(f[3], f[4])
+                    lon = ddmm_to_deg(f[5], f[6])
+                    spd_kn = float(f[7]) if f[7] else 0.0
+                    if status == b"A":
+                        print(f"RMC: FIX lat={lat} lon={lon} speed={spd_kn}kn")
+                    else:
+                        print("RMC: NOFIX")
+            except (ValueError, IndexError):
+                continue  # trame tronquée / corrompue
 
 if __name__ == "__main__":
     main()
@@ -16,33 +16,83 @@ Usage :
 """
 from __future__ import annotations
 import os
+import re
 import sys
 import time
 import uuid
 import threading
 import argparse
+import importlib
+from functools import cached_property
 from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from itertools import groupby
 
 # ── Charger .env ─────────────────────────────────────────────────────
 _base = os.path.dirname(os.path.abspath(__file__))
 _env_file = os.path.join(_base, ".env")
+# Une passe regex sur tout le fichier : CLE=valeur (commentaires et
+# lignes vides ne correspondent pas), espaces autour retirés
+_ENV_LINE = re.compile(r"^[ \t]*([A-Za-z_][A-Za-z0-9_]*)[ \t]*=[ \t]*(.*?)[ \t]*\r?$", re.M)
 if os.path.isfile(_env_file):
     with open(_env_file) as f:
-        for line in f:
-            line = line.strip()
-            if line and not line.startswith("#") and "=" in line:
-                k, v = line.split("=", 1)
-                os.environ.setdefault(k.strip(), v.strip())
+        for k, v in _ENV_LINE.findall(f.read()):
+            os.environ.setdefault(k, v)
 
 import config
-from core.database import (init_db, enqueue, dequeue_batch, mark_sent,
-                           mark_failed, queue_size, purge_old, lookup_badge)
-from core.sync import ApiClient
+from core.database import (init_db, enqueue, enqueue_many, flush_pending,
+                           dequeue_batch, release, mark_sent,
+                           mark_failed_batch, queue_size, purge_old,
+                           lookup_badge)
+from core.sync import ApiClient, BULK_ENDPOINTS, CONCURRENT_ENDPOINTS
 from core import state_machine as sm
 
+
+def _import(name: str):
+    """Importe un module driver, None s'il manque (dépendance absente)."""
+    try:
+        return importlib.import_module(name)
+    except Exception as e:
+        print(f"[INIT] Import {name}: {e}")
+        return None
+
+
+# Drivers importés une seule fois : la boucle 10 Hz n'a plus d'import
+# (lookup sys.modules) à chaque tick. Un module absent vaut None ; son
+# init échoue alors proprement dans init_all.
+gps = _import("drivers.gps")
+temperature = _import("drivers.temperature")
+gas = _import("drivers.gas")
+nfc = _import("drivers.nfc")
+buzzer = _import("drivers.buzzer")
+led = _import("drivers.led")
+buttons = _import("drivers.buttons")
+display = _import("drivers.display")
+vision = _import("core.vision")
+
+# Présence des modules optionnels, figée au boot : la boucle teste un
+# booléen au lieu d'entrer dans un try/except à chaque tick
+HAS_VISION = vision is not None
+HAS_DISPLAY = display is not None
+HAS_BUTTONS = buttons is not None
+
 # ─── Version ─────────────────────────────────────────────────────────
 FW_VERSION = "2.0.0"
 
+# Cadence de la boucle principale selon l'état (Hz). Les boutons
+# réveillent la boucle immédiatement : seule la fréquence de rafraîchis-
+# sement écran / capteurs baisse dans les états calmes.
+TICK_HZ = {
+    sm.BOOT: 1,
+    sm.READY: 2,
+    sm.AUTH_NFC: 10,          # clignotement icône NFC à 2 Hz
+    sm.ALCOHOL_CHECK: 5,
+    sm.TRIP_ACTIVE: 5,
+    sm.TRIP_STOP_CONFIRM: 5,
+    sm.MENU: 5,
+}
+DEFAULT_TICK_HZ = 10
+
 
 def utc_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
@@ -56,7 +106,6 @@ def init_all(args) -> dict:
 
     # GPS
     try:
-        from drivers import gps
         status["GPS"] = gps.init(config.GPS_NMEA_PORT, config.GPS_AT_PORT, config.GPS_BAUD)
     except Exception as e:
         print(f"[INIT] GPS: {e}")
@@ -64,7 +113,6 @@ def init_all(args) -> dict:
 
     # Température
     try:
-        from drivers import temperature
         status["TEMP"] = temperature.init(config.DHT_GPIO)
     except Exception as e:
         print(f"[INIT] TEMP: {e}")
@@ -72,7 +120,6 @@ def init_all(args) -> dict:
 
     # Gaz
     try:
-        from drivers import gas
         status["GAS"] = gas.init(config.GAS_GPIO)
     except Exception as e:
         print(f"[INIT] GAS: {e}")
@@ -80,7 +127,6 @@ def init_all(args) -> dict:
 
     # NFC
     try:
-        from drivers import nfc
         status["NFC"] = nfc.init()
     except Exception as e:
         print(f"[INIT] NFC: {e}")
@@ -88,7 +134,6 @@ def init_all(args) -> dict:
 
     # Buzzer
     try:
-        from drivers import buzzer
         status["BUZZER"] = buzzer.init(config.BUZZER_GPIO, config.BUZZER_FREQ)
     except Exception as e:
         print(f"[INIT] BUZZER: {e}")
@@ -96,7 +141,6 @@ def init_all(args) -> dict:
 
     # LED RGB
     try:
-        from drivers import led
         status["LED"] = led.init(config.LED_R_GPIO, config.LED_G_GPIO, config.LED_B_GPIO)
     except Exception as e:
         print(f"[INIT] LED: {e}")
@@ -104,7 +148,6 @@ def init_all(args) -> dict:
 
     # Boutons
     try:
-        from drivers import buttons
         status["BTN"] = buttons.init(
             config.BTN_START_GPIO,
             config.BTN_STOP_GPIO,
@@ -118,8 +161,13 @@ def init_all(args) -> dict:
     # OLED
     if not args.no_display:
         try:
-            from drivers import display
-            status["OLED"] = display.init()
+            status["OLED"] = display.init(
+                config.OLED_BUS,
+                config.OLED_DC_GPIO,
+                config.OLED_RST_GPIO,
+                config.OLED_CS_GPIO,
+                config.OLED_SPI_HZ,
+            )
         except Exception as e:
             print(f"[INIT] OLED: {e}")
             status["OLED"] = False
@@ -129,7 +177,6 @@ def init_all(args) -> dict:
     # Fatigue (Vision)
     if not args.no_vision:
         try:
-            from core import vision
             status["CAM"] = vision.init()
         except Exception as e:
             print(f"[INIT] VISION: {e}")
@@ -140,22 +187,56 @@ def init_all(args) -> dict:
     return status
 
 
+# ─── Lecture capteurs (au plus une fois par tick) ────────────────────
+
+class SensorSnapshot:
+    """Capteurs du tick, lus paresseusement : un champ n'est lu qu'au
+    premier accès (seuls les états qui en ont besoin paient la lecture),
+    puis réutilisé jusqu'à la fin du tick."""
+
+    @cached_property
+    def gps(self) -> dict:
+        return gps.read()
+
+    @cached_property
+    def temp(self) -> dict:
+        return temperature.read()
+
+    @cached_property
+    def gas(self) -> dict:
+        return gas.read()
+
+    @cached_property
+    def fatigue(self) -> dict:
+        return vision.read() if HAS_VISION else {}
+
+
+def read_sensors() -> SensorSnapshot:
+    """Snapshot du tick ; aucune lecture tant qu'un champ n'est pas lu."""
+    return SensorSnapshot()
+
+
 # ─── Collecte télémétrie ─────────────────────────────────────────────
 
-def build_telemetry_point(state: sm.State) -> dict:
-    """Construit un point avec TOUTES les données capteurs."""
-    from drivers import gps, temperature, gas
+# Champs sans capteur branché : toujours nuls, construits une seule fois
+_TELEMETRY_PLACEHOLDERS = {
+    # OBD placeholders
+    "engine_rpm": 0,
+    "vehicle_speed_obd_kmh": 0.0,
+    "engine_load_pct": 0.0,
+    "fuel_level_pct": 0.0,
+    "battery_voltage": 0.0,
 
-    gps_data = gps.read()
-    temp_data = temperature.read()
-    gas_data = gas.read()
+    # IMU placeholders
+    "accel_x": 0.0, "accel_y": 0.0, "accel_z": 0.0,
+    "gyro_x": 0.0, "gyro_y": 0.0, "gyro_z": 0.0,
+}
 
-    fatigue_data = {}
-    try:
-        from core import vision
-        fatigue_data = vision.read()
-    except Exception:
-        pass
+
+def build_telemetry_point(state: sm.State, snap: SensorSnapshot) -> dict:
+    """Construit un point avec TOUTES les données capteurs."""
+    gps_data, temp_data = snap.gps, snap.temp
+    gas_data, fatigue_data = snap.gas, snap.fatigue
 
     return {
         "time": utc_iso(),
@@ -193,27 +274,34 @@ def build_telemetry_point(state: sm.State) -> dict:
         "fatigue_head_down_sec": fatigue_data.get("fatigue_head_down_sec", 0.0),
         "fatigue_face_detected": fatigue_data.get("fatigue_face_detected", False),
 
-        # OBD placeholders
-        "engine_rpm": 0,
-        "vehicle_speed_obd_kmh": 0.0,
-        "engine_load_pct": 0.0,
-        "fuel_level_pct": 0.0,
-        "battery_voltage": 0.0,
-
-        # IMU placeholders
-        "accel_x": 0.0, "accel_y": 0.0, "accel_z": 0.0,
-        "gyro_x": 0.0, "gyro_y": 0.0, "gyro_z": 0.0,
+        # OBD / IMU : placeholders constants
+        **_TELEMETRY_PLACEHOLDERS,
     }
 
 
 # ─── Sync thread ─────────────────────────────────────────────────────
 
+SYNC_WORKERS = 4  # POST simultanés max (= pool_maxsize de la session)
+PURGE_INTERVAL_NS = 3600 * 1_000_000_000  # purge outbox : 1×/heure suffit
+
+
 def sync_loop(api: ApiClient, stop_event: threading.Event):
     """Thread : flush la queue vers l'API périodiquement."""
+    with ThreadPoolExecutor(max_workers=SYNC_WORKERS,
+                            thread_name_prefix="sync-post") as pool:
+        _sync_cycles(api, stop_event, pool)
+
+
+def _sync_cycles(api: ApiClient, stop_event: threading.Event,
+                 pool: ThreadPoolExecutor):
     cycle = 0
+    next_purge = time.monotonic_ns()  # première purge dès le boot
     while not stop_event.is_set():
         try:
-            purge_old(config.DB_PATH)
+            flush_pending(config.DB_PATH)
+            if time.monotonic_ns() >= next_purge:
+                purge_old(config.DB_PATH)
+                next_purge = time.monotonic_ns() + PURGE_INTERVAL_NS
             pending = queue_size(config.DB_PATH)
             batch = dequeue_batch(config.DB_PATH, limit=config.BATCH_SIZE)
 
@@ -223,18 +311,51 @@ def sync_loop(api: ApiClient, stop_event: threading.Event):
                 print(f"[SYNC] Queue: {pending} msg | Batch: {len(batch)} | API: {'OK' if api.is_online else 'OFFLINE'}")
 
             if batch:
-                sent_count = 0
-                for rid, endpoint, payload in batch:
-                    ok, msg = api.post(endpoint, payload)
-                    if ok:
-                        mark_sent(config.DB_PATH, [rid])
-                        sent_count += 1
+                sent_ids = []
+                failed_ids = []
+                # Séries consécutives d'un même endpoint (l'ordre de la
+                # queue est conservé entre séries) ; les endpoints "bulk"
+                # partent en un seul POST par série, ceux de
+                # CONCURRENT_ENDPOINTS en POST parallèles, les autres un
+                # par un dans l'ordre. Stop au premier échec.
+                for endpoint, rows in groupby(batch, key=lambda r: r[1]):
+                    rows = list(rows)
+                    if endpoint in BULK_ENDPOINTS:
+                        ok, msg = api.post_batch(endpoint, [p for _, _, p in rows])
+                        ids = [rid for rid, _, _ in rows]
+                        if ok:
+                            sent_ids.extend(ids)
+                            continue
+                        print(f"[SYNC] ÉCHEC {endpoint} (ids={ids[0]}..{ids[-1]}): {msg}")
+                        failed_ids.extend(ids)
+                        break  # stop sur erreur
+                    concurrent = endpoint in CONCURRENT_ENDPOINTS
+                    if concurrent:
+                        results = pool.map(lambda r: api.post(endpoint, r[2]), rows)
                     else:
+                        # Générateur : rien n'est envoyé après un échec
+                        results = (api.post(endpoint, p) for _, _, p in rows)
+                    for (rid, _, _), (ok, msg) in zip(rows, results):
+                        if ok:
+                            sent_ids.append(rid)
+                            continue
                         print(f"[SYNC] ÉCHEC {endpoint} (id={rid}): {msg}")
-                        mark_failed(config.DB_PATH, rid)
+                        failed_ids.append(rid)
+                        if not concurrent:
+                            break  # déjà envoyées en parallèle : tout acquitter
+                    if failed_ids:
                         break  # stop sur erreur
-                if sent_count:
-                    print(f"[SYNC] ✔ {sent_count}/{len(batch)} envoyés")
+                # Une transaction par type d'acquittement, pas une par ligne
+                mark_sent(config.DB_PATH, sent_ids)
+                mark_failed_batch(config.DB_PATH, failed_ids)
+                if failed_ids:
+                    # Lignes louées non tentées : dispo au prochain cycle
+                    done = set(sent_ids)
+                    done.update(failed_ids)
+                    release(config.DB_PATH, [rid for rid, _, _ in batch
+                                             if rid not in done])
+                if sent_ids:
+                    print(f"[SYNC] ✔ {len(sent_ids)}/{len(batch)} envoyés")
         except Exception as e:
             print(f"[SYNC] Exception: {e}")
 
@@ -244,20 +365,11 @@ def sync_loop(api: ApiClient, stop_event: threading.Event):
 # ─── Gestion d'état ──────────────────────────────────────────────────
 
 def handle_state(state: sm.State, btn: str | None,
-                 driver_status: dict, api: ApiClient):
+                 driver_status: dict, api: ApiClient, snap: SensorSnapshot):
     """Gère les transitions d'état selon boutons + événements capteurs."""
-    from drivers import gps, gas, buzzer, led, nfc
-
-    has_display = False
-    try:
-        from drivers import display
-        has_display = True
-    except Exception:
-        pass
-
     # ── BOOT ─────────────────────────────────────────────────────────
     if state.current == sm.BOOT:
-        if has_display:
+        if HAS_DISPLAY:
             display.screen_boot(config.KIT_SERIAL, FW_VERSION, driver_status)
         led.set_named("info")
         buzzer.play("info")
@@ -279,11 +391,10 @@ def handle_state(state: sm.State, btn: str | None,
 
     # ── READY ────────────────────────────────────────────────────────
     if state.current == sm.READY:
-        gps_data = gps.read()
+        gps_data = snap.gps
 
-        if has_display:
-            from drivers import temperature
-            temp_data = temperature.read()
+        if HAS_DISPLAY:
+            temp_data = snap.temp
             display.screen_ready(
                 driver=state.driver_name,
                 gps_fix=gps_data.get("gps_ok", False),
@@ -304,16 +415,18 @@ def handle_state(state: sm.State, btn: str | None,
     # ── AUTH_NFC ─────────────────────────────────────────────────────
     if state.current == sm.AUTH_NFC:
         blink = int(state.time_in_state * 2) % 2 == 0
-        if has_display:
+        if HAS_DISPLAY:
             display.screen_auth_nfc(blink=blink)
 
         if btn == "back":
+            nfc.stop_reader()
             state.reset_auth()
             state.transition(sm.READY)
             return
 
-        # Scanner badge
-        badge = nfc.scan(timeout=0.3)
+        # Badge lu par le thread NFC : le tick ne bloque plus sur le PN532
+        nfc.start_reader()
+        badge = nfc.take()
         if badge:
             uid_hash = badge["uid_hash"]
             uid_hex = badge["uid"]
@@ -334,7 +447,7 @@ def handle_state(state: sm.State, btn: str | None,
                 auth_result = "offline_allowed"
 
             # Event NFC
-            gps_data = gps.read()
+            gps_data = snap.gps
             enqueue(config.DB_PATH, "nfc_auth", {
                 "ts": utc_iso(),
                 "org_id": config.ORG_ID,
@@ -347,7 +460,7 @@ def handle_state(state: sm.State, btn: str | None,
                 "lon": gps_data.get("lon", 0),
             })
 
-            if has_display:
+            if HAS_DISPLAY:
                 display.screen_auth_result(True, state.driver_name)
             buzzer.play("success")
             led.set_named("ok")
@@ -355,38 +468,39 @@ def handle_state(state: sm.State, btn: str | None,
 
             state.transition(sm.ALCOHOL_CHECK)
             state.reset_alcohol()
-            state.alcohol_start = time.time()
+            state.alcohol_start = time.monotonic()
 
         # Timeout 60s → retour
         if state.time_in_state > 60:
+            nfc.stop_reader()
             state.transition(sm.READY)
         return
 
     # ── ALCOHOL_CHECK ────────────────────────────────────────────────
     if state.current == sm.ALCOHOL_CHECK:
-        elapsed = time.time() - state.alcohol_start
+        elapsed = time.monotonic() - state.alcohol_start
 
         if state.alcohol_phase == sm.ALC_WARMUP:
-            if has_display:
+            if HAS_DISPLAY:
                 display.screen_alcohol_warmup(elapsed, config.ALCOHOL_WARMUP_S)
             if elapsed >= config.ALCOHOL_WARMUP_S:
                 state.alcohol_phase = sm.ALC_BLOW
-                state.alcohol_start = time.time()
+                state.alcohol_start = time.monotonic()
                 buzzer.play("info")
 
         elif state.alcohol_phase == sm.ALC_BLOW:
             countdown = max(0, config.ALCOHOL_BLOW_S - elapsed)
-            if has_display:
+            if HAS_DISPLAY:
                 display.screen_alcohol_blow(countdown)
 
             if elapsed >= config.ALCOHOL_BLOW_S:
                 # Lire le capteur
-                gas_data = gas.read()
+                gas_data = snap.gas
                 alc_fail = gas_data.get("gas_detected", False)
                 ts_end = utc_iso()
 
-                # Event alcool
-                enqueue(config.DB_PATH, "alcohol", {
+                # Event alcool (+ alerte éventuelle, même transaction)
+                events = [("alcohol", {
                     "ts_start": utc_iso(),
                     "ts_end": ts_end,
                     "org_id": config.ORG_ID,
@@ -396,7 +510,7 @@ def handle_state(state: sm.State, btn: str | None,
                     "sensor_warmup_time_s": config.ALCOHOL_WARMUP_S,
                     "ttl_state": not alc_fail,
                     "result": "fail" if alc_fail else "pass",
-                })
+                })]
 
                 if alc_fail:
                     state.alcohol_result = "fail"
@@ -405,7 +519,7 @@ def handle_state(state: sm.State, btn: str | None,
                     led.blink("red", 0.3, 0.3)
 
                     # Alerte cloud
-                    enqueue(config.DB_PATH, "alert", {
+                    events.append(("alert", {
                         "ts": ts_end,
                         "org_id": config.ORG_ID,
                         "kit_id": config.KIT_ID,
@@ -414,22 +528,23 @@ def handle_state(state: sm.State, btn: str | None,
                         "severity": "critical",
                         "message": "Alcooltest échoué — trajet bloqué",
                         "meta": {"driver_id": state.driver_id},
-                    })
+                    }))
                 else:
                     state.alcohol_result = "pass"
                     state.alcohol_phase = sm.ALC_PASS
                     buzzer.play("success")
                     led.set_named("ok")
+                enqueue_many(config.DB_PATH, events)
 
         elif state.alcohol_phase == sm.ALC_PASS:
-            if has_display:
+            if HAS_DISPLAY:
                 display.screen_alcohol_pass()
             if btn == "start":
                 # ── Démarrer le trajet ───────────────────────────────
                 state.trip_id = str(uuid.uuid4())
-                state.trip_start_time = time.time()
+                state.trip_start_time = time.monotonic()
 
-                gps_data = gps.read()
+                gps_data = snap.gps
                 enqueue(config.DB_PATH, "trip_open", {
                     "trip_id": state.trip_id,
                     "org_id": config.ORG_ID,
@@ -443,23 +558,19 @@ def handle_state(state: sm.State, btn: str | None,
                 })
 
                 # Lancer la vision / fatigue
-                try:
-                    from core import vision
-                    if not vision._data.get("fatigue_ok"):
-                        vision.start()
-                except Exception:
-                    pass
+                if HAS_VISION and not vision.is_running():
+                    vision.start()
 
                 state.transition(sm.TRIP_ACTIVE)
                 buzzer.play("success")
 
         elif state.alcohol_phase == sm.ALC_FAIL:
-            if has_display:
+            if HAS_DISPLAY:
                 display.screen_alcohol_fail()
             if btn == "start":
                 # Refaire le test
                 state.reset_alcohol()
-                state.alcohol_start = time.time()
+                state.alcohol_start = time.monotonic()
             elif btn == "back":
                 state.reset_auth()
                 state.reset_alcohol()
@@ -476,17 +587,13 @@ def handle_state(state: sm.State, btn: str | None,
 
     # ── TRIP_ACTIVE ──────────────────────────────────────────────────
     if state.current == sm.TRIP_ACTIVE:
-        gps_data = gps.read()
-        fatigue_data = {}
-        try:
-            from core import vision
-            fatigue_data = vision.read()
-        except Exception:
-            pass
+        gps_data = snap.gps
+        fatigue_data = snap.fatigue
 
-        elapsed_min = (time.time() - (state.trip_start_time or time.time())) / 60
+        now = time.monotonic()
+        elapsed_min = (now - (state.trip_start_time or now)) / 60
 
-        if has_display:
+        if HAS_DISPLAY:
             display.screen_trip(
                 speed_kmh=gps_data.get("speed_gps_kmh", 0),
                 gps_fix=gps_data.get("gps_ok", False),
@@ -496,12 +603,15 @@ def handle_state(state: sm.State, btn: str | None,
                 elapsed_min=elapsed_min,
             )
 
+        # Alertes du tick : écrites ensemble, en une seule transaction
+        alerts = []
+
         # Alertes fatigue
         fat_level = fatigue_data.get("fatigue_level", 0)
         if fat_level >= 2:
             led.blink("red", 0.2, 0.2)
             buzzer.play("critical")
-            enqueue(config.DB_PATH, "alert", {
+            alerts.append(("alert", {
                 "ts": utc_iso(),
                 "org_id": config.ORG_ID,
                 "kit_id": config.KIT_ID,
@@ -511,7 +621,7 @@ def handle_state(state: sm.State, btn: str | None,
                 "severity": "critical",
                 "message": f"Alerte fatigue niveau {fat_level}",
                 "meta": fatigue_data,
-            })
+            }))
         elif fat_level == 1:
             led.set_named("warning")
         else:
@@ -519,10 +629,10 @@ def handle_state(state: sm.State, btn: str | None,
             led.set_named("ok")
 
         # Alerte gaz
-        gas_data = gas.read()
+        gas_data = snap.gas
         if gas_data.get("gas_detected", False):
             buzzer.play("critical")
-            enqueue(config.DB_PATH, "alert", {
+            alerts.append(("alert", {
                 "ts": utc_iso(),
                 "org_id": config.ORG_ID,
                 "kit_id": config.KIT_ID,
@@ -531,25 +641,27 @@ def handle_state(state: sm.State, btn: str | None,
                 "alert_type": "gas_detected",
                 "severity": "critical",
                 "message": "Gaz détecté dans l'habitacle",
-            })
+            }))
 
         # Alerte température
-        from drivers import temperature
-        temp_data = temperature.read()
+        temp_data = snap.temp
         temp_c = temp_data.get("temperature_c") or 0
         if temp_c >= config.TEMP_CRITICAL_C:
             buzzer.play("critical")
-            enqueue(config.DB_PATH, "alert", {
+            alerts.append(("alert", {
                 "ts": utc_iso(), "org_id": config.ORG_ID,
                 "kit_id": config.KIT_ID, "vehicle_id": config.VEHICLE_ID,
                 "trip_id": state.trip_id,
                 "alert_type": "temp_critical",
                 "severity": "critical",
                 "message": f"Température cabine critique : {temp_c:.1f}°C",
-            })
+            }))
         elif temp_c >= config.TEMP_WARN_C:
             buzzer.play("warning")
 
+        if alerts:
+            enqueue_many(config.DB_PATH, alerts)
+
         if btn == "stop":
             state.transition(sm.TRIP_STOP_CONFIRM)
             buzzer.play("info")
@@ -559,12 +671,12 @@ def handle_state(state: sm.State, btn: str | None,
 
     # ── TRIP_STOP_CONFIRM ────────────────────────────────────────────
     if state.current == sm.TRIP_STOP_CONFIRM:
-        if has_display:
+        if HAS_DISPLAY:
             display.screen_stop_confirm()
 
         if btn == "start":
             # Confirmer arrêt
-            gps_data = gps.read()
+            gps_data = snap.gps
             enqueue(config.DB_PATH, "trip_close", {
                 "trip_id": state.trip_id,
                 "org_id": config.ORG_ID,
@@ -577,11 +689,8 @@ def handle_state(state: sm.State, btn: str | None,
             })
 
             # Arrêter la vision
-            try:
-                from core import vision
+            if HAS_VISION:
                 vision.stop()
-            except Exception:
-                pass
 
             state.reset_trip()
             state.reset_auth()
@@ -596,7 +705,7 @@ def handle_state(state: sm.State, btn: str | None,
 
     # ── MENU ─────────────────────────────────────────────────────────
     if state.current == sm.MENU:
-        gps_data = gps.read()
+        gps_data = snap.gps
         menu_data = {
             "sensors": driver_status,
             "queue_size": queue_size(config.DB_PATH),
@@ -611,7 +720,7 @@ def handle_state(state: sm.State, btn: str | None,
             "uptime": f"{time.monotonic() / 60:.0f}min",
         }
 
-        if has_display:
+        if HAS_DISPLAY:
             display.screen_menu(state.menu_page, menu_data)
 
         if btn == "menu":
@@ -671,53 +780,65 @@ def main():
     )
     sync_thread.start()
 
-    # Timers
-    last_telemetry = 0.0
-    last_network_refresh = 0.0
+    # Timers : échéances en ns d'horloge monotone (un saut NTP de
+    # l'horloge murale ne décale ni ne bloque la planification)
+    telemetry_period_ns = config.TELEMETRY_INTERVAL_S * 1_000_000_000
+    network_period_ns = 30 * 1_000_000_000
+    next_telemetry = next_network_refresh = time.monotonic_ns()
 
     print("[MAIN] Boucle principale démarrée")
 
     try:
         while True:
-            now = time.time()
+            now = time.monotonic_ns()
 
             # Lire les boutons
+            btn = buttons.poll() if HAS_BUTTONS else None
+            if btn:
+                print(f"[DEBUG] Bouton détecté : {btn}")
 
-            btn = None
-            try:
-                from drivers import buttons
-                btn = buttons.poll()
-                if btn:
-                    print(f"[DEBUG] Bouton détecté : {btn}")
-            except Exception:
-                pass
-
-            # Gérer l'état
-            handle_state(state, btn, driver_status, api)
+            # Gérer l'état (capteurs lus à la demande, une fois par tick)
+            snap = read_sensors()
+            handle_state(state, btn, driver_status, api, snap)
 
             # Collecte télémétrie périodique
-            if now - last_telemetry >= config.TELEMETRY_INTERVAL_S:
+            if now >= next_telemetry:
                 if state.current in (sm.TRIP_ACTIVE, sm.READY):
-                    point = build_telemetry_point(state)
+                    point = build_telemetry_point(state, snap)
                     enqueue(config.DB_PATH, "telemetry", {"points": [point]})
-                    last_telemetry = now
+                    next_telemetry = now + telemetry_period_ns
 
             # Refresh réseau toutes les 30s
-            if now - last_network_refresh >= 30:
+            if now >= next_network_refresh:
                 try:
-                    from drivers import gps
                     gps.refresh_network()
                 except Exception:
                     pass
-                last_network_refresh = now
-
-            # Ne pas saturer le CPU
-            time.sleep(0.1)
+                next_network_refresh = now + network_period_ns
+
+            # Ne pas saturer le CPU : tick à la cadence de l'état, écourté
+            # par un appui bouton (traité tout de suite). Boutons en polling :
+            # pas sous DEFAULT_TICK_HZ, sinon les appuis brefs sont perdus
+            hz = TICK_HZ.get(state.current, DEFAULT_TICK_HZ)
+            if HAS_BUTTONS and buttons.needs_polling():
+                hz = max(hz, DEFAULT_TICK_HZ)
+            period = 1.0 / hz
+            if HAS_BUTTONS:
+                buttons.wait(period)
+            else:
+                time.sleep(period)
 
     except KeyboardInterrupt:
         print("\n[MAIN] Arrêt demandé")
     finally:
         sync_stop.set()
+        sync_thread.join(timeout=2)
+
+        # Télémétrie encore en mémoire → outbox (renvoyée au prochain boot)
+        try:
+            flush_pending(config.DB_PATH)
+        except Exception as e:
+            print(f"[DB] Flush final échoué: {e}")
 
         # Cleanup drivers
         for mod_name in ["drivers.gps", "drivers.temperature", "drivers.gas",
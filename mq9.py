@@ -1,5 +1,5 @@
 import RPi.GPIO as GPIO
-import time
+import threading
 from datetime import datetime
 
 # Configuration
@@ -11,21 +11,34 @@ print("=== Moniteur de Gaz Multi-Cibles MQ-9 ===")
 print("Gaz détectables : Alcool, CO, CH4, GPL")
 print("Appuyez sur Ctrl+C pour arrêter\n")
 
+_last_state = None
+
+def handle_transition(gas_present):
+    """Affiche le statut uniquement quand la sortie du capteur change."""
+    global _last_state
+    if gas_present == _last_state:
+        return
+    _last_state = gas_present
+
+    timestamp = datetime.now().strftime('%H:%M:%S')
+
+    # 0 = Détection, 1 = Normal sur la plupart des modules
+    if gas_present:
+        print(f"[{timestamp}] !!! ALERTE : Anomalie détectée !!!")
+        print("Action : Vérifiez l'air (Alcool, fumée ou fuite de gaz possible)")
+    else:
+        print(f"[{timestamp}] Statut : Air normal")
+
 try:
-    while True:
-        # Lecture du capteur (0 = Détection, 1 = Normal sur la plupart des modules)
-        gas_present = GPIO.input(GAS_PIN) 
-        
-        timestamp = datetime.now().strftime('%H:%M:%S')
-        
-        if gas_present:
-            print(f"[{timestamp}] !!! ALERTE : Anomalie détectée !!!")
-            print("Action : Vérifiez l'air (Alcool, fumée ou fuite de gaz possible)")
-        else:
-            print(f"[{timestamp}] Statut : Air normal")
-            
-        time.sleep(2) # On vérifie toutes les 2 secondes
+    # État initial, puis notification par interruption (front montant/descendant)
+    handle_transition(GPIO.input(GAS_PIN))
+    GPIO.add_event_detect(GAS_PIN, GPIO.BOTH,
+                          callback=lambda c: handle_transition(GPIO.input(c)),
+                          bouncetime=100)
+
+    # Aucun réveil CPU tant que la ligne ne change pas
+    threading.Event().wait()
 
 except KeyboardInterrupt:
     print("\nFermeture du moniteur...")
-    GPIO.cleanup()
\ No newline at end of file
+    GPIO.cleanup()
@@ -1,7 +1,9 @@
 import time
+import threading
 import board
 import adafruit_dht
 import adafruit_ssd1306
+import numpy as np
 from PIL import Image, ImageDraw, ImageFont
 import RPi.GPIO as GPIO
 from picamera2 import Picamera2
@@ -19,24 +21,63 @@ dht_device = adafruit_dht.DHT22(DHT_PIN)
 GPIO.setmode(GPIO.BCM)
 GPIO.setup(GAS_PIN, GPIO.IN)
 
+# Réveil immédiat de la boucle sur front descendant (LOW = gaz détecté)
+gas_event = threading.Event()
+GPIO.add_event_detect(GAS_PIN, GPIO.FALLING,
+                      callback=lambda c: gas_event.set(), bouncetime=100)
+
 # Initialisation Caméra
 picam2 = Picamera2()
 picam2.start()
 
 print("Système de surveillance démarré...")
 
+# ── Glyphes pré-rendus ─────────────────────────────────────────────
+# Le texte est rendu une seule fois par PIL au démarrage ; ensuite chaque
+# rafraîchissement ne fait que copier des tableaux numpy (pas d'appel PIL).
+font = ImageFont.load_default()
+GLYPH_H = font.getbbox("Ag%0")[3]
+W, H = oled.width, oled.height
+
+def _render(txt):
+    """Rend `txt` en tableau uint8 (0/1) de hauteur GLYPH_H."""
+    img = Image.new("1", (max(int(font.getlength(txt)), 1), GLYPH_H))
+    ImageDraw.Draw(img).text((0, 0), txt, font=font, fill=255)
+    return np.array(img, dtype=np.uint8)
+
+GLYPHS = {ch: _render(ch) for ch in "0123456789.-%C"}
+LABELS = {txt: _render(txt) for txt in ("TEMP: ", "HUMID: ", "GAZ: ", "ALERTE !!!", "NORMAL")}
+
+# Framebuffer 1 bit/pixel réutilisé (1 octet par pixel avant packbits)
+_fb = np.zeros((H, W), dtype=np.uint8)
+
+def _blit(x, y, bitmap):
+    """Copie un glyphe dans le framebuffer (clippé à droite), retourne x suivant."""
+    gw = min(bitmap.shape[1], W - x)
+    if gw > 0:
+        _fb[y:y + GLYPH_H, x:x + gw] = bitmap[:, :gw]
+    return x + bitmap.shape[1]
+
+def _blit_text(x, y, txt):
+    for ch in txt:
+        x = _blit(x, y, GLYPHS[ch])
+    return x
+
+# Dernier contenu affiché : pas de transfert I2C si rien n'a changé
+_last_draw = (None, None, None)
+
 def draw_screen(temp, hum, status):
-    # Créer une image vide (fond noir)
-    image = Image.new("1", (oled.width, oled.height))
-    draw = ImageDraw.Draw(image)
-    font = ImageFont.load_default()
-    
-    # Dessiner les infos
-    draw.text((0, 0),  f"TEMP: {temp:.1f}C", font=font, fill=255)
-    draw.text((0, 20), f"HUMID: {hum}%", font=font, fill=255)
-    draw.text((0, 45), f"GAZ: {status}", font=font, fill=255)
-    
-    oled.image(image)
+    # Effacer le framebuffer (fond noir)
+    _fb.fill(0)
+
+    # Dessiner les infos : libellés statiques + valeurs glyphe par glyphe
+    _blit_text(_blit(0, 0, LABELS["TEMP: "]), 0, f"{temp:.1f}C")
+    _blit_text(_blit(0, 20, LABELS["HUMID: "]), 20, f"{hum}%")
+    _blit(_blit(0, 45, LABELS["GAZ: "]), 45, LABELS[status])
+
+    # 8 pixels → 1 octet (MSB = pixel de gauche, format PIL mode "1")
+    packed = np.packbits(_fb, axis=1).tobytes()
+    oled.image(Image.frombytes("1", (W, H), packed))
     oled.show()
 
 try:
@@ -50,8 +91,11 @@ try:
             gas_detected = GPIO.input(GAS_PIN) == GPIO.LOW
             gas_status = "ALERTE !!!" if gas_detected else "NORMAL"
             
-            # Mise à jour de l'écran
-            draw_screen(temperature, humidity, gas_status)
+            # Mise à jour de l'écran (seulement si l'affichage change)
+            key = (round(temperature, 1), humidity, gas_status)
+            if key != _last_draw:
+                draw_screen(temperature, humidity, gas_status)
+                _last_draw = key
 
             # Si alerte gaz : Prendre une photo
             if gas_detected:
@@ -64,7 +108,9 @@ try:
             # Erreurs de lecture DHT22 fréquentes, on ignore
             pass
             
-        time.sleep(2)
+        # Attente 2 s max, interrompue dès qu'un front gaz arrive
+        gas_event.wait(2)
+        gas_event.clear()
 
 except KeyboardInterrupt:
     print("Arrêt du système...")
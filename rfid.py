@@ -1,8 +1,13 @@
 import time
+import functools
 import board
 import busio
 from adafruit_pn532.i2c import PN532_I2C
 
+# GPIO (BCM) relié à la broche IRQ (P70_IRQ) du PN532 — None si non câblée
+IRQ_PIN = None
+
+@functools.lru_cache(maxsize=8)
 def format_uid(uid: bytes) -> str:
     return ":".join(f"{b:02X}" for b in uid)
 
@@ -18,6 +23,13 @@ def main():
 
     # Configure en mode lecteur RFID/NFC
     pn532.SAM_configuration()
+
+    if IRQ_PIN is not None:
+        import RPi.GPIO as GPIO
+        GPIO.setmode(GPIO.BCM)
+        GPIO.setup(IRQ_PIN, GPIO.IN, pull_up_down=GPIO.PUD_UP)
+        print(f"IRQ PN532 sur GPIO {IRQ_PIN} (attente sur front, pas de polling)")
+
     print("Prêt. Approche une carte/badge... (Ctrl+C pour quitter)")
 
     last_uid = None
@@ -25,14 +37,24 @@ def main():
     debounce_s = 1.0  # évite de spammer si la carte reste posée
 
     while True:
-        uid = pn532.read_passive_target(timeout=0.2)
+        if IRQ_PIN is not None:
+            # Lance la détection puis dort jusqu'au front IRQ (carte présente)
+            pn532.listen_for_passive_target()
+            if GPIO.wait_for_edge(IRQ_PIN, GPIO.FALLING, timeout=1000) is None:
+                continue
+            uid = pn532.get_passive_target()
+        else:
+            # Sans IRQ : le Pi dort dans l'attente I2C du driver (1 s)
+            uid = pn532.read_passive_target(timeout=1.0)
+
         if uid is not None:
-            now = time.time()
+            uid = bytes(uid)
+            now = time.monotonic()
             if uid != last_uid or (now - last_time) > debounce_s:
                 print("UID:", format_uid(uid), " (len=", len(uid), ")")
                 last_uid = uid
                 last_time = now
-        time.sleep(0.05)
+            time.sleep(0.05)  # carte posée : ne pas saturer le bus
 
 if __name__ == "__main__":
     main()
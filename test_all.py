@@ -37,19 +37,32 @@ CYAN   = "\033[96m"
 BOLD   = "\033[1m"
 RESET  = "\033[0m"
 
-results = {}   # nom -> (ok: bool, detail: str)
+# Résultats en tableaux parallèles (un indice par périphérique)
+_names: list[str] = []
+_status = bytearray()      # 1 = OK, 0 = FAIL
+_details: list[str] = []
 
 def header(txt):
     print(f"\n{CYAN}{BOLD}{'─'*50}")
     print(f"  {txt}")
     print(f"{'─'*50}{RESET}")
 
+def _record(name, passed, detail):
+    if name in _names:  # un test peut réécrire son propre résultat
+        i = _names.index(name)
+        _status[i] = passed
+        _details[i] = detail
+    else:
+        _names.append(name)
+        _status.append(passed)
+        _details.append(detail)
+
 def ok(name, detail=""):
-    results[name] = (True, detail)
+    _record(name, 1, detail)
     print(f"  {GREEN}✔ {name}: {detail}{RESET}")
 
 def fail(name, detail=""):
-    results[name] = (False, detail)
+    _record(name, 0, detail)
     print(f"  {RED}✘ {name}: {detail}{RESET}")
 
 # ──────────────────────────── TESTS ─────────────────────────────
@@ -289,10 +302,9 @@ def test_rfid():
     header("6/7 — RFID PN532 (I2C)")
     try:
         import board
-        import busio
         from adafruit_pn532.i2c import PN532_I2C
 
-        i2c = busio.I2C(board.SCL, board.SDA)
+        i2c = board.I2C()  # même bus que l'OLED (singleton)
         pn532 = PN532_I2C(i2c, debug=False)
 
         ic, ver, rev, support = pn532.firmware_version
@@ -359,13 +371,10 @@ def show_results_oled(oled):
         font = ImageFont.load_default()
 
         draw.text((0, 0), "== RESULTATS ==", font=font, fill=255)
-        y = 12
-        for name, (passed, _) in results.items():
-            tag = "OK" if passed else "FAIL"
-            draw.text((0, y), f"{name}: {tag}", font=font, fill=255)
-            y += 10
-            if y > 54:
-                break
+        # 5 lignes de 10 px sous le titre, en un seul appel PIL
+        lines = [f"{n}: {'OK' if s else 'FAIL'}" for n, s in zip(_names[:5], _status)]
+        draw.multiline_text((0, 12), "\n".join(lines), font=font, fill=255,
+                            spacing=10 - font.getbbox("A")[3])
 
         oled.image(img)
         oled.show()
@@ -396,9 +405,9 @@ def main():
 
     # --- Résumé console ---
     header("RÉSUMÉ")
-    passed = sum(1 for v in results.values() if v[0])
-    total  = len(results)
-    for name, (status, detail) in results.items():
+    passed = sum(_status)
+    total  = len(_names)
+    for name, status, detail in zip(_names, _status, _details):
         tag = f"{GREEN}OK{RESET}" if status else f"{RED}FAIL{RESET}"
         print(f"  [{tag}] {name}: {detail}")
 
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+test_sync.py — Tests unitaires du client API (core/sync.py), sans réseau.
+
+    python3 -m unittest test_sync
+"""
+
+import threading
+import unittest
+from unittest import mock
+
+try:
+    import requests
+    from core.sync import ApiClient
+except ImportError:  # requests absent : rien à tester
+    requests = None
+
+
+@unittest.skipIf(requests is None, "requests non installé")
+class ApiClientStatsTest(unittest.TestCase):
+    def setUp(self):
+        self.api = ApiClient("http://api.invalid", "KIT-TEST", "key")
+
+    def _post(self, *args):
+        # Garde-fou : un verrou mal repris bloquerait post() pour toujours
+        result = []
+        t = threading.Thread(target=lambda: result.append(self.api.post(*args)),
+                             daemon=True)
+        t.start()
+        t.join(timeout=5)
+        self.assertFalse(t.is_alive(), "post() bloqué")
+        return result[0]
+
+    def test_failed_post_counts_fail(self):
+        with mock.patch.object(self.api.session, "post",
+                               side_effect=requests.ConnectionError):
+            ok, msg = self._post("health", {})
+            self.assertFalse(ok)
+            self.assertEqual(msg, "Connection refused")
+            self.assertEqual(self.api.consecutive_fails, 1)
+            self._post("health", {})
+        self.assertEqual(self.api.consecutive_fails, 2)
+
+    def test_api_error_body_counts_fail(self):
+        resp = mock.Mock(status_code=200, text="")
+        resp.json.return_value = {"ok": False, "code": "E", "message": "refusé"}
+        with mock.patch.object(self.api.session, "post", return_value=resp):
+            ok, _ = self._post("health", {})
+        self.assertFalse(ok)
+        self.assertEqual(self.api.consecutive_fails, 1)
+
+    def test_success_resets_fails(self):
+        self.api.consecutive_fails = 2
+        resp = mock.Mock(status_code=200, text="{}")
+        resp.json.return_value = {"ok": True}
+        with mock.patch.object(self.api.session, "post", return_value=resp):
+            ok, _ = self._post("health", {})
+        self.assertTrue(ok)
+        self.assertEqual(self.api.consecutive_fails, 0)
+        self.assertGreater(self.api.last_ok_time, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()